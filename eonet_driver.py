@@ -704,8 +704,7 @@ def _flipnote_save():
     srv = _srv()
     if not srv.current_flipnote:
         return
-    with open(srv.current_flipnote['path'], 'w', encoding='utf-8') as f:
-        json.dump(srv.current_flipnote['data'], f, indent=2, ensure_ascii=False)
+    srv._write_json(srv.current_flipnote['path'], srv.current_flipnote['data'])
 
 
 def _icr_cache_path(gc):
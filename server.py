@@ -4,6 +4,9 @@ LinkPlay MCP Server
 ROM exploration and hacking for Nintendo DS/GBA/GBC/GB through Claude's interface.
 """
 
+import bisect
+import functools
+import itertools
 import json
 import os
 import re
@@ -12,6 +15,7 @@ import struct
 import shutil
 import sys
 import tempfile
+import types
 from pathlib import Path
 from typing import Optional
 from mcp.server import Server
@@ -29,7 +33,14 @@ sys.modules["server"] = sys.modules[__name__]
 from setup_tools import setup_tools, get_tool_path
 
 # Eonet ICR engine — auto-discovery, flipnote labeling, query resolution
-from eonet_driver import _build_eonet, eonet_resolve, _auto_enc_loc, resolve_chain
+from eonet_driver import _build_eonet, eonet_resolve
+
+# BFS encounter-location tables and chain traversal, when this eonet_driver has them
+try:
+    from eonet_driver import _auto_enc_loc, resolve_chain
+except ImportError:
+    _auto_enc_loc = {}
+    resolve_chain = None
 
 # Required: ndspy for DS ROM handling
 import ndspy.rom
@@ -47,6 +58,42 @@ try:
 except ImportError:
     _cs_arm = _cs_thumb = None
 
+# Fast JSON for flipnote read/write (bytes in, bytes out)
+try:
+    import orjson
+    _jloads = orjson.loads
+    def _jdumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    _jloads = json.loads
+    def _jdumps(obj) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _write_json(path, obj):
+    """Write obj as JSON via a temp file + os.replace, so a crash mid-write never truncates a flipnote."""
+    # Unique temp name per write: the eonet build thread and tool calls can save the same file at once
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                               prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_jdumps(obj))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+# Precompiled little-endian formats for header/decoder reads
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_U16x2 = struct.Struct('<HH')
+_GEN5_ENTRY = struct.Struct('<IH')  # Gen V text entry: offset u32, char_count u16
+
 server = Server("linkplay")
 
 # State
@@ -67,6 +114,9 @@ _restore_task = None               # Background task handle for ROM restore
 _startup_log = []                  # Collects restore/BFS messages for the model to see
 eonet_labels = {}  # game_code -> {narc_path: {'role': str, 'labels': {idx: 'Name (Role)'}}}
 eonet_index = {}   # game_code -> [{name_lower: str, path: str, role: str, idx: int}, ...]
+# Direct refs to the named text tables the decoders hit on every record.
+# Rebound by _refresh_text_caches() whenever text_tables is replaced or re-detected.
+_tt_species = _tt_moves = _tt_items = _tt_abilities = _tt_types = _tt_natures = _tt_classes = _tt_trainer_names = ()
 
 
 def _rom_is_fully_loaded(gc: str) -> bool:
@@ -166,6 +216,12 @@ def _invalidate_narc(narc_path: str):
     _narc_cache.pop((gc, narc_path), None)
 
 
+def _drop_narc_cache(gc: str):
+    """Forget every parsed NARC for a game code (ROM closed or reopened from disk)."""
+    for key in [k for k in _narc_cache if k[0] == gc]:
+        del _narc_cache[key]
+
+
 def _parse_rom_prefix(path: str):
     """Parse optional game-code prefix from path. 'IRE:a/0/1/6:1' -> ('IRE', 'a/0/1/6:1').
     Handles both 3-char (NDS) and 4-char (GBA) game codes."""
@@ -222,6 +278,7 @@ def _restore_state(game_code):
     gc = state['current_rom']['header']['game_code']
     eonet_labels[gc] = state.get('eonet_labels', {})
     eonet_index[gc] = state.get('eonet_index', [])
+    _refresh_text_caches()
 
 
 def _clear_active_state():
@@ -235,6 +292,40 @@ def _clear_active_state():
     text_gen = None
     narc_roles = {}
     tm_table = []
+    _refresh_text_caches()
+
+
+def _refresh_text_caches():
+    """Rebind the _tt_* table refs from the active text_tables."""
+    global _tt_species, _tt_moves, _tt_items, _tt_abilities, _tt_types, _tt_natures, _tt_classes, _tt_trainer_names
+    _tt_species = text_tables.get('species', ())
+    _tt_moves = text_tables.get('moves', ())
+    _tt_items = text_tables.get('items', ())
+    _tt_abilities = text_tables.get('abilities', ())
+    _tt_types = text_tables.get('type_names', ())
+    _tt_natures = text_tables.get('natures', ())
+    _tt_classes = text_tables.get('trainer_classes', ())
+    _tt_trainer_names = text_tables.get('trainer_names', ())
+    _pwt_pool_cache.clear()
+    _tt_lower.clear()
+
+
+_tt_lower = {}  # table name -> (entries list, lowercased entries) for dowse name lookups
+
+
+def _lowered_table(tbl_name: str, entries: list) -> list:
+    """Lowercased copy of a text table, built once per table ('' for non-string entries)."""
+    hit = _tt_lower.get(tbl_name)
+    if hit is None or hit[0] is not entries or len(hit[1]) != len(entries):
+        hit = _tt_lower[tbl_name] = (entries, [e.lower() if isinstance(e, str) else '' for e in entries])
+    return hit[1]
+
+
+def _species_name(species_id: int) -> str:
+    """Species name by ID, '#id' if out of range (same as get_text('species', id))."""
+    return _tt_species[species_id] if species_id < len(_tt_species) else f"#{species_id}"
+
+
 working_dir = Path.home() / ".linkplay" / "work"
 flipnotes_dir = Path.home() / ".linkplay" / "flipnotes"
 note_history = Path.home() / ".linkplay" / "note_history.jsonl"
@@ -252,6 +343,62 @@ def ensure_dirs():
     flipnotes_dir.mkdir(parents=True, exist_ok=True)
 
 
+def _iter_flipnotes():
+    """Yield (path_str, data) for every readable .fpn in flipnotes_dir.
+    Uses os.scandir directly — no Path object per entry; unreadable files are skipped.
+    """
+    try:
+        it = os.scandir(flipnotes_dir)
+    except FileNotFoundError:
+        return
+    with it:
+        for entry in it:
+            if not entry.name.endswith('.fpn'):
+                continue
+            try:
+                with open(entry.path, 'rb') as f:
+                    data = _jloads(f.read())
+            except:
+                continue
+            if isinstance(data, dict):
+                yield entry.path, data
+
+
+_fpn_meta_cache = {}  # .fpn path -> ((mtime_ns, size, inode), {'game_codes', 'game_title', 'note_count'})
+
+
+def _iter_flipnote_meta():
+    """Yield (path_str, meta) for every readable .fpn — just game codes, title and note count.
+    A flipnote is only parsed again when its stat stamp changes (every write os.replace()s a new file),
+    so listing and game-code lookups don't re-read unchanged notes.
+    """
+    try:
+        it = os.scandir(flipnotes_dir)
+    except FileNotFoundError:
+        return
+    with it:
+        for entry in it:
+            if not entry.name.endswith('.fpn'):
+                continue
+            try:
+                st = entry.stat()
+                stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+                hit = _fpn_meta_cache.get(entry.path)
+                if hit is None or hit[0] != stamp:
+                    with open(entry.path, 'rb') as f:
+                        data = _jloads(f.read())
+                    if not isinstance(data, dict):
+                        continue
+                    hit = _fpn_meta_cache[entry.path] = (stamp, {
+                        'game_codes': data.get('game_codes', []) or [data.get('game_code', '')],
+                        'game_title': data.get('game_title'),
+                        'note_count': len(data.get('notes', {})),
+                    })
+            except:
+                continue
+            yield entry.path, hit[1]
+
+
 def _note_belongs_to_game(path: str, game_codes: list) -> bool:
     """Return True if this note path belongs in a flipnote covering game_codes."""
     codes = set(game_codes)
@@ -379,13 +526,7 @@ def recover_notes_from_logs():
         return 0
 
     # Write each note only to the flipnote(s) it belongs to
-    for fpn_file in flipnotes_dir.glob("*.fpn"):
-        try:
-            with open(fpn_file, 'r', encoding='utf-8') as fh:
-                fpn_data = json.load(fh)
-        except:
-            continue
-
+    for fpn_file, fpn_data in _iter_flipnotes():
         game_codes = fpn_data.get('game_codes', [fpn_data.get('game_code', '')])
         fpn_data.setdefault('notes', {})
         wrote = False
@@ -415,8 +556,7 @@ def recover_notes_from_logs():
             recovered += 1
 
         if wrote:
-            with open(fpn_file, 'w', encoding='utf-8') as fh:
-                json.dump(fpn_data, fh, indent=2, ensure_ascii=False)
+            _write_json(fpn_file, fpn_data)
 
     _consolidate_flipnotes()
 
@@ -429,18 +569,13 @@ def _consolidate_flipnotes():
     """
     # Map each game code to its flipnote file
     code_to_fpn = {}
-    for fpn_file in flipnotes_dir.glob("*.fpn"):
-        try:
-            with open(fpn_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            codes = data.get('game_codes', [])
-            if not codes:
-                codes = [data.get('game_code', '')]
-            for code in codes:
-                if code:
-                    code_to_fpn.setdefault(code, []).append((fpn_file, data))
-        except:
-            continue
+    for fpn_file, data in _iter_flipnotes():
+        codes = data.get('game_codes', [])
+        if not codes:
+            codes = [data.get('game_code', '')]
+        for code in codes:
+            if code:
+                code_to_fpn.setdefault(code, []).append((fpn_file, data))
 
     # For each pair group, find the shared flipnote and merge individuals into it
     for pair_name, pair_codes in FLIPNOTE_PAIRS.items():
@@ -453,8 +588,8 @@ def _consolidate_flipnotes():
         seen_paths = set()
         unique = []
         for fpn_file, data in all_fpns:
-            if str(fpn_file) not in seen_paths:
-                seen_paths.add(str(fpn_file))
+            if fpn_file not in seen_paths:
+                seen_paths.add(fpn_file)
                 unique.append((fpn_file, data))
 
         if len(unique) <= 1:
@@ -487,13 +622,12 @@ def _consolidate_flipnotes():
 
             # Remove individual flipnote after merging
             try:
-                ind_file.unlink()
+                os.unlink(ind_file)
             except:
                 pass
 
         if merged:
-            with open(shared_file, 'w', encoding='utf-8') as f:
-                json.dump(shared_data, f, indent=2, ensure_ascii=False)
+            _write_json(shared_file, shared_data)
 
 
 def detect_rom_type(path: str) -> str:
@@ -531,7 +665,7 @@ def read_nds_header(path: str) -> dict:
         short_title = f.read(12).decode('ascii', errors='ignore').strip('\x00')
         full_code = f.read(4).decode('ascii', errors='ignore')
         f.seek(0x68)
-        banner_offset = struct.unpack('<I', f.read(4))[0]
+        banner_offset = _U32.unpack(f.read(4))[0]
 
     game_code = full_code[:3] if len(full_code) >= 3 else full_code
     region_char = full_code[3] if len(full_code) >= 4 else 'E'
@@ -646,17 +780,9 @@ def get_partner_codes(game_code: str) -> list:
 def find_flipnote(game_code: str) -> Optional[Path]:
     """Find existing flipnote by game code (checks shared partners too)."""
     partners = set(get_partner_codes(game_code))
-    for fpn in flipnotes_dir.glob("*.fpn"):
-        try:
-            with open(fpn, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                codes = data.get('game_codes', [])
-                if not codes:
-                    codes = [data.get('game_code', '')]
-                if partners & set(codes):
-                    return fpn
-        except:
-            continue
+    for fpn, meta in _iter_flipnote_meta():
+        if partners.intersection(meta['game_codes']):
+            return Path(fpn)
     return None
 
 
@@ -673,18 +799,14 @@ def upgrade_to_shared_flipnote(game_code: str) -> Path:
     shared_path = flipnotes_dir / f"{safe_name}.fpn"
 
     # Collect ALL existing flipnotes for any partner code
+    partner_set = set(partner_codes)
     found = []
-    for fpn in flipnotes_dir.glob("*.fpn"):
-        try:
-            with open(fpn, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            codes = set(data.get('game_codes', []))
-            if not codes:
-                codes = {data.get('game_code', '')}
-            if codes & set(partner_codes):
-                found.append((fpn, data))
-        except:
-            continue
+    for fpn, data in _iter_flipnotes():
+        codes = set(data.get('game_codes', []))
+        if not codes:
+            codes = {data.get('game_code', '')}
+        if codes & partner_set:
+            found.append((fpn, data))
 
     # Merge notes, region codes, keep best tree/stats
     merged_notes = {}
@@ -693,32 +815,28 @@ def upgrade_to_shared_flipnote(game_code: str) -> Path:
     for _, data in found:
         merged_notes.update(data.get('notes', {}))
         for region, rcodes in data.get('region_codes', {}).items():
-            merged_regions.setdefault(region, []).extend(rcodes)
+            merged_regions.setdefault(region, set()).update(rcodes)
         if not best_tree:
             best_tree = data.get('tree', [])
             best_stats = data.get('rom_stats', {})
 
-    # Deduplicate region codes
-    for region in merged_regions:
-        merged_regions[region] = list(set(merged_regions[region]))
-
     merged_data = {
         'schema_version': 2,
         'game_codes': partner_codes,
         'game_title': display_name,
-        'region_codes': merged_regions,
+        'region_codes': {k: sorted(v) for k, v in merged_regions.items()},
         'tree': best_tree,
         'rom_stats': best_stats,
         'notes': merged_notes,
     }
 
-    with open(shared_path, 'w', encoding='utf-8') as f:
-        json.dump(merged_data, f, indent=2, ensure_ascii=False)
+    _write_json(shared_path, merged_data)
 
     # Delete old separate flipnotes
+    shared_str = str(shared_path)
     for fpn, _ in found:
-        if fpn != shared_path and fpn.exists():
-            fpn.unlink()
+        if fpn != shared_str and os.path.exists(fpn):
+            os.unlink(fpn)
 
     return shared_path
 
@@ -742,9 +860,8 @@ def create_flipnote(game_code: str, game_title: str, region: str, region_char: s
     existing_notes = {}
     if path.exists():
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                existing_data = json.load(f)
-                existing_notes = existing_data.get("notes", {})
+            existing_data = _jloads(path.read_bytes())
+            existing_notes = existing_data.get("notes", {})
         except:
             pass
 
@@ -758,20 +875,35 @@ def create_flipnote(game_code: str, game_title: str, region: str, region_char: s
         'notes': existing_notes
     }
 
-    with open(path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    _write_json(path, data)
 
     return path
 
 
-def build_nds_structure(rom, rom_path: str) -> tuple:
-    """Build flat tree and ROM stats from NDS ROM."""
+# rom_stats['files'] type codes. Entries are (size, type_code, narc_file_count) tuples —
+# far smaller than a dict per file, and stored as plain [size, type, count] lists in flipnotes.
+FILE_TYPE_FILE, FILE_TYPE_NARC, FILE_TYPE_BINARY, FILE_TYPE_OVERLAY = 0, 1, 2, 3
+
+
+def _narc_file_count(data: bytes) -> Optional[int]:
+    """File count straight from the NARC header's FATB block, without parsing the NARC.
+    Returns None if the header doesn't look like a standard NARC.
+    """
+    if len(data) < 0x1C or data[:4] != b'NARC' or data[0x10:0x14] != b'BTAF':
+        return None
+    return _U32.unpack_from(data, 0x18)[0]
+
+
+def build_nds_structure(rom, rom_path: str, overlays: dict = None) -> tuple:
+    """Build flat tree and ROM stats from NDS ROM.
+    overlays: already-loaded {overlay_id: data} (from _load_overlays) to size overlays without decompressing them again.
+    """
     tree = []
     rom_stats = {
         'total_bytes': Path(rom_path).stat().st_size,
         'arm9_size': len(rom.arm9),
         'arm7_size': len(rom.arm7),
-        'files': {},  # path -> {size, type, file_count if narc}
+        'files': {},  # path -> (size, type_code, narc_file_count or 0)
         'file_count': 0,
         'narc_count': 0,
         'total_narc_files': 0
@@ -779,49 +911,52 @@ def build_nds_structure(rom, rom_path: str) -> tuple:
 
     tree.append("arm9.bin")
     tree.append("arm7.bin")
-    rom_stats['files']['arm9.bin'] = {'size': len(rom.arm9), 'type': 'binary'}
-    rom_stats['files']['arm7.bin'] = {'size': len(rom.arm7), 'type': 'binary'}
+    rom_stats['files']['arm9.bin'] = (len(rom.arm9), FILE_TYPE_BINARY, 0)
+    rom_stats['files']['arm7.bin'] = (len(rom.arm7), FILE_TYPE_BINARY, 0)
 
     # Add overlays to tree
-    try:
-        parsed_ovs = rom.loadArm9Overlays()
-        for ov_id in sorted(parsed_ovs.keys()):
-            ov = parsed_ovs[ov_id]
-            ov_name = f"overlay{ov_id}.bin"
-            tree.append(ov_name)
-            rom_stats['files'][ov_name] = {'size': len(ov.data), 'type': 'overlay'}
-    except Exception:
-        pass
+    if overlays is None:
+        overlays = _load_overlays(rom)
+    for ov_id in sorted(overlays):
+        ov_name = f"overlay{ov_id}.bin"
+        tree.append(ov_name)
+        rom_stats['files'][ov_name] = (len(overlays[ov_id]), FILE_TYPE_OVERLAY, 0)
+
+    # Hoisted lookups for the per-file loop (large ROMs walk tens of thousands of entries)
+    files_dict = rom_stats['files']
+    get_file = rom.files.__getitem__
+    tree_append = tree.append
+    tree_extend = tree.extend
 
     def walk_folder(folder, path=""):
+        prefix = f"{path}/" if path else ""
+        id_of = folder.idOf
         for filename in folder.files:
-            full_path = f"{path}/{filename}" if path else filename
-            tree.append(full_path)
+            full_path = prefix + filename
+            tree_append(full_path)
             rom_stats['file_count'] += 1
 
             try:
-                file_id = folder.idOf(filename)
-                file_data = rom.files[file_id]
-                file_info = {'size': len(file_data), 'type': 'file'}
+                file_data = get_file(id_of(filename))
 
                 if len(file_data) >= 4 and file_data[:4] == b'NARC':
-                    narc = ndspy.narc.NARC(file_data)
-                    file_info['type'] = 'narc'
-                    file_info['file_count'] = len(narc.files)
+                    n = _narc_file_count(file_data)
+                    if n is None:
+                        n = len(ndspy.narc.NARC(file_data).files)
+                    files_dict[full_path] = (len(file_data), FILE_TYPE_NARC, n)
                     rom_stats['narc_count'] += 1
-                    rom_stats['total_narc_files'] += len(narc.files)
+                    rom_stats['total_narc_files'] += n
 
                     # Add NARC internal files to tree
-                    for idx in range(len(narc.files)):
-                        tree.append(f"{full_path}:{idx}")
-
-                rom_stats['files'][full_path] = file_info
+                    tree_extend(f"{full_path}:{idx}" for idx in range(n))
+                else:
+                    files_dict[full_path] = (len(file_data), FILE_TYPE_FILE, 0)
             except:
                 pass
 
         for name, subfolder in folder.folders:
-            folder_path = f"{path}/{name}" if path else name
-            tree.append(folder_path + "/")
+            folder_path = prefix + name
+            tree_append(folder_path + "/")
             walk_folder(subfolder, folder_path)
 
     if rom.filenames:
@@ -839,6 +974,59 @@ def decompress_arm9(arm9_path: str):
         pass
 
 
+def _blz_decompress(data: bytes) -> bytes:
+    """Decompress a BLZ (bottom-up LZ) ARM9 in memory, following blz -d.
+    Raises on a bad footer or a stream that ends early, so the caller can fall back to the tool.
+    """
+    inc_len = _U32.unpack_from(data, len(data) - 4)[0]
+    if not inc_len:
+        return bytes(data)
+    hdr_len = data[-5]
+    if not 8 <= hdr_len <= 0x0B:
+        raise ValueError(f"bad BLZ header length {hdr_len}")
+    enc_len = _U32.unpack_from(data, len(data) - 8)[0] & 0xFFFFFF
+    dec_len = len(data) - enc_len
+    pak_len = enc_len - hdr_len
+    if dec_len < 0 or pak_len < 0:
+        raise ValueError("bad BLZ footer")
+    raw_len = len(data) + inc_len
+
+    # The compressed section is stored back-to-front: decode it reversed, then flip the output back
+    pak = data[dec_len:dec_len + pak_len][::-1]
+    raw = bytearray(data[:dec_len])
+    append = raw.append
+    p = 0
+    while len(raw) < raw_len:
+        if p == pak_len:
+            raise ValueError("unexpected end of BLZ stream")
+        flags = pak[p]
+        p += 1
+        for bit in (0x80, 0x40, 0x20, 0x10, 0x08, 0x04, 0x02, 0x01):
+            if len(raw) >= raw_len:
+                break
+            if not flags & bit:
+                if p == pak_len:
+                    raise ValueError("unexpected end of BLZ stream")
+                append(pak[p])
+                p += 1
+            else:
+                if p + 1 >= pak_len:
+                    raise ValueError("unexpected end of BLZ stream")
+                pos = (pak[p] << 8) | pak[p + 1]
+                p += 2
+                count = min((pos >> 12) + 3, raw_len - len(raw))
+                disp = (pos & 0xFFF) + 3
+                start = len(raw) - disp
+                if start < 0:
+                    raise ValueError("BLZ back-reference before start of output")
+                if disp >= count:
+                    raw += raw[start:start + count]
+                else:
+                    raw += (raw[start:] * (count // disp + 1))[:count]
+    raw[dec_len:] = raw[dec_len:][::-1]
+    return bytes(raw)
+
+
 def compress_arm9(arm9_path: str):
     """Compress ARM9 using blz."""
     blz_path = get_tool_path('blz')
@@ -889,6 +1077,59 @@ def detect_compression(data: bytes) -> str:
     return 'none'
 
 
+def _lz_decompress(data: bytes) -> bytes:
+    """Decompress LZ10 (0x10) / LZ11 (0x11) in-process, without spawning lzss/lzx.
+    Raises on truncated or malformed input so the caller can fall back to the tools.
+    """
+    lz11 = data[0] == 0x11
+    size = data[1] | (data[2] << 8) | (data[3] << 16)
+    pos = 4
+    if size == 0 and lz11:
+        size = _U32.unpack_from(data, 4)[0]
+        pos = 8
+    out = bytearray()
+    append = out.append
+    while len(out) < size:
+        flags = data[pos]
+        pos += 1
+        for bit in (0x80, 0x40, 0x20, 0x10, 0x08, 0x04, 0x02, 0x01):
+            if not flags & bit:
+                append(data[pos])
+                pos += 1
+            else:
+                b = data[pos]
+                if not lz11:
+                    count = (b >> 4) + 3
+                    disp = (((b & 0xF) << 8) | data[pos + 1]) + 1
+                    pos += 2
+                elif b >> 4 == 0:
+                    b1 = data[pos + 1]
+                    count = (((b & 0xF) << 4) | (b1 >> 4)) + 0x11
+                    disp = (((b1 & 0xF) << 8) | data[pos + 2]) + 1
+                    pos += 3
+                elif b >> 4 == 1:
+                    b2 = data[pos + 2]
+                    count = (((b & 0xF) << 12) | (data[pos + 1] << 4) | (b2 >> 4)) + 0x111
+                    disp = (((b2 & 0xF) << 8) | data[pos + 3]) + 1
+                    pos += 4
+                else:
+                    count = (b >> 4) + 1
+                    disp = (((b & 0xF) << 8) | data[pos + 1]) + 1
+                    pos += 2
+                start = len(out) - disp
+                if start < 0:
+                    raise ValueError("LZ back-reference before start of output")
+                if disp >= count:
+                    out += out[start:start + count]
+                else:
+                    # Overlapping copy repeats the last `disp` bytes
+                    out += (out[start:] * (count // disp + 1))[:count]
+            if len(out) >= size:
+                break
+    del out[size:]
+    return bytes(out)
+
+
 def decompress_data(data: bytes) -> tuple:
     """Attempt to decompress data. Returns (data, compression_type)."""
     compression = detect_compression(data)
@@ -896,6 +1137,12 @@ def decompress_data(data: bytes) -> tuple:
     if compression == 'none':
         return data, 'none'
 
+    if compression in ('lz10', 'lz11'):
+        try:
+            return _lz_decompress(data), compression
+        except Exception:
+            pass
+
     tool_map = {
         'lz10': 'lzss', 'lz11': 'lzx', 'lz40': 'lzx',
         'huffman4': 'huffman', 'huffman8': 'huffman', 'rle': 'rle'
@@ -1171,15 +1418,14 @@ def _scan_gen3_trainer_names(rom_data: bytes, charmap: dict, eos: int):
     if 'trainer_names' in text_tables:
         return
 
-    import struct as _struct
     names_by_offset = {}
     for i in range(0, len(rom_data) - 40, 4):
         if rom_data[i] > 3 or rom_data[i + 1] == 0 or rom_data[i + 1] >= 200:
             continue
-        count = _struct.unpack_from('<I', rom_data, i + 32)[0]
+        count = _U32.unpack_from(rom_data, i + 32)[0]
         if not (1 <= count <= 6):
             continue
-        ptr = _struct.unpack_from('<I', rom_data, i + 36)[0]
+        ptr = _U32.unpack_from(rom_data, i + 36)[0]
         if not (0x08000000 <= ptr <= 0x0AFFFFFF):
             continue
         j, chars = i + 4, []
@@ -1263,6 +1509,7 @@ def bootstrap_text_tables_binary(rom_data: bytes, rom_type: str,
 
     text_tables = {}
     text_gen = gen
+    _refresh_text_caches()
 
     # Scan for text tables (species, moves, abilities, natures — pure string arrays)
     candidates = scan_rom_text(rom_data, charmap, eos)
@@ -1311,6 +1558,15 @@ _GEN5_CHARMAP = {
     0x246D: 'the', 0x246E: 'The',
     0x2486: 'Poké', 0x2487: 'mon',
 }
+_GEN5_CHARMAP = {k: sys.intern(v) for k, v in _GEN5_CHARMAP.items()}
+# Dense u16 → substitution table (None = not mapped): one list index per lookup
+_GEN5_CHARMAP_ARR = [None] * 0x10000
+for _k, _v in _GEN5_CHARMAP.items():
+    _GEN5_CHARMAP_ARR[_k] = _v
+_GEN5_NL = sys.intern('\n')
+_GEN5_VAR = sys.intern('[var]')
+# Codes the bulk UTF-16 decode can't pass through as-is: control, terminator, charmap
+_GEN5_SPECIAL_RE = re.compile('[' + re.escape(''.join(map(chr, (0xFFFE, 0xFFFF, *_GEN5_CHARMAP)))) + ']')
 
 def _derive_gen5_mult(species_data: bytes) -> int:
     """Derive XOR multiplier from species file entry 1 ('Bulbasaur').
@@ -1318,23 +1574,59 @@ def _derive_gen5_mult(species_data: bytes) -> int:
     """
     if len(species_data) < 16:
         return 0x2983
-    entry_count = struct.unpack_from('<H', species_data, 2)[0]
-    section_offset = struct.unpack_from('<I', species_data, 0x0C)[0]
+    entry_count = _U16.unpack_from(species_data, 2)[0]
+    section_offset = _U32.unpack_from(species_data, 0x0C)[0]
     if entry_count < 2 or section_offset + 4 > len(species_data):
         return 0x2983
     # Read entry 1 from entry table
     entry_pos = section_offset + 4 + (1 * 8)
     if entry_pos + 8 > len(species_data):
         return 0x2983
-    offset = struct.unpack_from('<I', species_data, entry_pos)[0]
+    offset = _U32.unpack_from(species_data, entry_pos)[0]
     str_offset = section_offset + offset
     if str_offset + 2 > len(species_data):
         return 0x2983
-    encrypted_0 = struct.unpack_from('<H', species_data, str_offset)[0]
+    encrypted_0 = _U16.unpack_from(species_data, str_offset)[0]
     four_mult = encrypted_0 ^ 0x0042
     return (four_mult // 4) & 0xFFFF
 
 
+def _unpack_9bit(words: list) -> list:
+    """Split u16 words into LSB-first 9-bit codes.
+    9 words = 144 bits = exactly 16 codes, so each 18-byte block is unpacked
+    from one int with fixed shifts instead of growing a single bigint.
+    """
+    raw = struct.pack(f'<{len(words)}H', *words)
+    codes = []
+    for pos in range(0, len(raw), 18):
+        block = int.from_bytes(raw[pos:pos + 18], 'little')
+        nbits = min(144, (len(raw) - pos) * 8)
+        codes.extend((block >> s) & 0x1FF for s in range(0, nbits - 8, 9))
+    return codes
+
+
+@functools.lru_cache(maxsize=None)
+def _gen5_keystream(key: int) -> bytes:
+    """Gen V per-string keystream starting at key, as little-endian bytes.
+    ROL3 on a u16 repeats every 16 steps, so the whole stream is one 32-byte period.
+    """
+    ks = []
+    for _ in range(16):
+        ks.append(key)
+        key = ((key << 3) | (key >> 13)) & 0xFFFF
+    return struct.pack('<16H', *ks)
+
+
+_GEN5_KS_BYTES = 256  # keystream prefix kept as an int: covers strings up to 128 chars
+
+
+@functools.lru_cache(maxsize=8192)
+def _gen5_keystream_int(key: int) -> int:
+    """First _GEN5_KS_BYTES of the keystream as one little-endian int, so short
+    strings are decrypted with a mask instead of tiling and re-parsing bytes."""
+    return int.from_bytes(_gen5_keystream(key) * (_GEN5_KS_BYTES // 32), 'little')
+
+
 def decode_gen5_text(data: bytes, mult: int = 0x2983) -> list:
     """Decode a Gen V encrypted text file. MULT derived once from NARC, passed in.
     Seed = (entry_index + 3) * mult, key advances via ROL3.
@@ -1343,8 +1635,8 @@ def decode_gen5_text(data: bytes, mult: int = 0x2983) -> list:
     if len(data) < 16:
         return []
 
-    entry_count = struct.unpack_from('<H', data, 2)[0]
-    section_offset = struct.unpack_from('<I', data, 0x0C)[0]
+    entry_count = _U16.unpack_from(data, 2)[0]
+    section_offset = _U32.unpack_from(data, 0x0C)[0]
 
     if entry_count == 0 or entry_count > 10000:
         return []
@@ -1358,37 +1650,29 @@ def decode_gen5_text(data: bytes, mult: int = 0x2983) -> list:
         entry_pos = entry_table_start + (i * 8)
         if entry_pos + 8 > len(data):
             break
-        offset = struct.unpack_from('<I', data, entry_pos)[0]
-        char_count = struct.unpack_from('<H', data, entry_pos + 4)[0]
+        offset, char_count = _GEN5_ENTRY.unpack_from(data, entry_pos)
 
         str_offset = section_offset + offset
         key = ((i + 3) * mult) & 0xFFFF
 
-        # Decrypt all u16 values for this entry
-        vals = []
-        for j in range(char_count):
-            char_pos = str_offset + (j * 2)
-            if char_pos + 2 > len(data):
-                break
-            enc = struct.unpack_from('<H', data, char_pos)[0]
-            dec = enc ^ key
-            key = ((key << 3) | (key >> 13)) & 0xFFFF
-            vals.append(dec)
+        # Decrypt the whole entry in one XOR: ciphertext and the repeated
+        # keystream as two ints (truncated at end of data)
+        n = max(0, min(char_count, (len(data) - str_offset) // 2))
+        nbytes = n * 2
+        if nbytes <= _GEN5_KS_BYTES:
+            ks = _gen5_keystream_int(key) & ((1 << (nbytes * 8)) - 1)
+        else:
+            ks = int.from_bytes((_gen5_keystream(key) * (nbytes // 32 + 1))[:nbytes], 'little')
+        plain = (int.from_bytes(data[str_offset:str_offset + nbytes], 'little') ^ ks).to_bytes(nbytes, 'little')
+        vals = struct.unpack(f'<{n}H', plain)
 
         # F100 = 9-bit compressed text (LSB-first, 0x1FF terminator)
         if vals and vals[0] == 0xF100:
-            bits = 0
-            nbits = 0
-            for w in vals[1:]:
-                if w == 0xFFFF:
-                    break
-                bits |= (w << nbits)
-                nbits += 16
+            words = vals[1:]
+            if 0xFFFF in words:
+                words = words[:words.index(0xFFFF)]
             chars = []
-            while nbits >= 9:
-                c = bits & 0x1FF
-                bits >>= 9
-                nbits -= 9
+            for c in _unpack_9bit(words):
                 if c == 0x1FF:
                     break
                 try:
@@ -1398,38 +1682,50 @@ def decode_gen5_text(data: bytes, mult: int = 0x2983) -> list:
             strings.append(''.join(chars))
             continue
 
-        # Normal text: parse control codes and characters
-        chars = []
-        j = 0
-        while j < len(vals):
+        # Normal text fast path: decode every u16 as UTF-16 in one call. Plain
+        # strings are done here; otherwise only the part from the first
+        # control/terminator/charmap code goes through the walker below.
+        nvals = len(vals)
+        text = plain.decode('utf-16-le', 'surrogatepass')
+        if len(text) != nvals:  # a surrogate pair merged — keep one char per u16
+            text = ''.join(map(chr, vals))
+        m = _GEN5_SPECIAL_RE.search(text)
+        if m is None:
+            strings.append(text)
+            continue
+        j = m.start()
+
+        # Parse control codes and characters. Plain runs between special
+        # codes are copied as slices of the already-decoded text.
+        pieces = [text[:j]]
+        append = pieces.append
+        while j < nvals:
             dec = vals[j]
-            j += 1
 
             if dec == 0xFFFF:
                 break
             elif dec == 0xFFFE:
-                ctrl_type = vals[j] if j < len(vals) else 0
-                j += 1
-                param_count = vals[j] if j < len(vals) else 0
-                j += 1
-                j += param_count  # skip params
+                ctrl_type = vals[j + 1] if j + 1 < nvals else 0
+                param_count = vals[j + 2] if j + 2 < nvals else 0
+                j += 3 + param_count  # skip params
                 if ctrl_type == 0x0000 or ctrl_type & 0xFF00 == 0x0000:
-                    chars.append('\n')
+                    append(_GEN5_NL)
                 elif ctrl_type & 0xFF00 == 0x0100:
-                    chars.append('[var]')
+                    append(_GEN5_VAR)
                 elif ctrl_type & 0xFF00 in (0xBE00, 0xFF00):
-                    pass  # formatting, skip
+                    continue  # formatting, skip
                 else:
-                    chars.append(f'[ctrl:{ctrl_type:04X}]')
-            elif dec in _GEN5_CHARMAP:
-                chars.append(_GEN5_CHARMAP[dec])
+                    append(f'[ctrl:{ctrl_type:04X}]')
+            elif _GEN5_CHARMAP_ARR[dec] is not None:
+                append(_GEN5_CHARMAP_ARR[dec])
+                j += 1
             else:
-                try:
-                    chars.append(chr(dec))
-                except (ValueError, OverflowError):
-                    chars.append(f'\\x{dec:04X}')
+                m = _GEN5_SPECIAL_RE.search(text, j + 1)
+                k = m.start() if m else nvals
+                append(text[j:k])
+                j = k
 
-        strings.append(''.join(chars))
+        strings.append(''.join(pieces))
 
     return strings
 
@@ -1553,6 +1849,15 @@ GAME_INFO = {
     'BPEE': {'gen': 3, 'title': 'POKÉMON EMERALD'},
 }
 
+# Read-only per-game views built once: role -> path, and path -> role (paths normalized
+# like _auto_decode's lookup). narc_roles starts from a copy of the latter.
+_GAME_NARCS = types.MappingProxyType({gc: types.MappingProxyType(info.get('narcs', {})) for gc, info in GAME_INFO.items()})
+_GAME_NARC_ROLES = types.MappingProxyType({
+    gc: types.MappingProxyType({path.strip('/'): role for role, path in narcs.items() if role != 'text'})
+    for gc, narcs in _GAME_NARCS.items()
+})
+_NO_NARCS = types.MappingProxyType({})
+
 # Content fingerprints — universal across all Pokemon games.
 # (entry_index, expected_string) pairs that ALL must match.
 TABLE_FINGERPRINTS = {
@@ -1611,44 +1916,67 @@ def auto_detect_tables() -> dict:
     # Use -1 as sentinel (no valid integer key is negative).
     found = {k: -1 for k in text_tables if isinstance(k, str)}
 
-    # Pass 1: exact fingerprints (entry at specific index must match)
-    # Try English first, then Japanese — same indices, different strings.
-    for fingerprint_set in (TABLE_FINGERPRINTS, TABLE_FINGERPRINTS_GEN3, TABLE_FINGERPRINTS_JPN):
-        for file_idx in sorted(k for k in text_tables if isinstance(k, int)):
-            strings = text_tables[file_idx]
-            if not isinstance(strings, list) or len(strings) < 2:
-                continue
-            for table_name, markers in fingerprint_set.items():
-                if table_name in found:
-                    continue
-                if all(idx < len(strings) and strings[idx].strip().upper() == expected.upper() for idx, expected in markers):
-                    text_tables[table_name] = strings
-                    found[table_name] = file_idx
+    # Passes 1-2b in a single scan over the text files. Rule groups in priority
+    # order: exact fingerprints (English, Gen III, Japanese — same indices,
+    # different strings), then heuristic markers (all listed strings must exist
+    # in file), then substring markers. A table takes the first file matched by
+    # the earliest group that lists it, same as running each group as its own pass.
+    fp_sets = (TABLE_FINGERPRINTS, TABLE_FINGERPRINTS_GEN3, TABLE_FINGERPRINTS_JPN)
+    n_fp = len(fp_sets)
+    hits = [{} for _ in range(n_fp + 2)]  # group -> {table_name: file_idx}
+    top_group = {}
+    for g, rules in enumerate(fp_sets + (HEURISTIC_MARKERS, HEURISTIC_SUBSTR)):
+        for table_name in rules:
+            if table_name not in found:
+                top_group.setdefault(table_name, g)
+    # A table is settled once its top-priority group hits — nothing later can win
+    pending = set(top_group)
 
-    # Pass 2: heuristic markers (all listed strings must exist in file)
     for file_idx in sorted(k for k in text_tables if isinstance(k, int)):
+        if not pending:
+            break
         strings = text_tables[file_idx]
         if not isinstance(strings, list):
             continue
-        string_set_upper = set(s.strip().upper() for s in strings if isinstance(s, str))
+        if len(strings) >= 2:
+            for g, fingerprint_set in enumerate(fp_sets):
+                h = hits[g]
+                for table_name, markers in fingerprint_set.items():
+                    if table_name not in pending or table_name in h:
+                        continue
+                    if all(idx < len(strings) and strings[idx].strip().upper() == expected.upper() for idx, expected in markers):
+                        h[table_name] = file_idx
+                        if top_group[table_name] == g:
+                            pending.discard(table_name)
+
+        string_set_upper = None
+        h = hits[n_fp]
         for table_name, markers in HEURISTIC_MARKERS.items():
-            if table_name in found:
+            if table_name not in pending or table_name in h:
                 continue
+            if string_set_upper is None:
+                string_set_upper = set(s.strip().upper() for s in strings if isinstance(s, str))
             if all(m.upper() in string_set_upper for m in markers):
-                text_tables[table_name] = strings
-                found[table_name] = file_idx
+                h[table_name] = file_idx
+                if top_group[table_name] == n_fp:
+                    pending.discard(table_name)
 
-    # Pass 2b: substring markers
-    for file_idx in sorted(k for k in text_tables if isinstance(k, int)):
-        strings = text_tables[file_idx]
-        if not isinstance(strings, list):
-            continue
+        joined = None
+        h = hits[n_fp + 1]
         for table_name, markers in HEURISTIC_SUBSTR.items():
-            if table_name in found:
+            if table_name not in pending or table_name in h:
                 continue
-            joined = ' '.join(s for s in strings if isinstance(s, str)).lower()
+            if joined is None:
+                joined = ' '.join(s for s in strings if isinstance(s, str)).lower()
             if all(m.lower() in joined for m in markers):
-                text_tables[table_name] = strings
+                h[table_name] = file_idx
+                if top_group[table_name] == n_fp + 1:
+                    pending.discard(table_name)
+
+    for h in hits:
+        for table_name, file_idx in h.items():
+            if table_name not in found:
+                text_tables[table_name] = text_tables[file_idx]
                 found[table_name] = file_idx
 
     # Promote trainer_names_gen5 -> trainer_names if Gen IV version wasn't found
@@ -1723,6 +2051,7 @@ def auto_detect_tables() -> dict:
                         found['pokedex_flavor'] = candidate
                         break
 
+    _refresh_text_caches()
     return found
 
 
@@ -1874,17 +2203,16 @@ def decode_gen3_trainer(header: bytes, party_data: bytes, party_flags: int) -> d
 
     party_flags: bit 0 = has custom moves, bit 1 = has held item
     """
-    import struct
     if len(header) < 40:
         return {}
 
     flags = header[0]
     trainer_class = header[1]
     name_bytes = header[4:16]
-    items = [struct.unpack_from('<H', header, 16 + i*2)[0] for i in range(4)]
-    is_double = struct.unpack_from('<I', header, 24)[0]
-    ai_flags = struct.unpack_from('<I', header, 28)[0]
-    party_count = struct.unpack_from('<I', header, 32)[0]
+    items = [_U16.unpack_from(header, 16 + i*2)[0] for i in range(4)]
+    is_double = _U32.unpack_from(header, 24)[0]
+    ai_flags = _U32.unpack_from(header, 28)[0]
+    party_count = _U32.unpack_from(header, 32)[0]
 
     # Decode name using Gen III charmap
     name = ''.join(_GEN3_CHARMAP_EN.get(b, '') for b in name_bytes).strip()
@@ -1907,16 +2235,16 @@ def decode_gen3_trainer(header: bytes, party_data: bytes, party_flags: int) -> d
         if off + member_size > len(party_data):
             break
         m = party_data[off:off+member_size]
-        iv = struct.unpack_from('<H', m, 0)[0]
-        level = struct.unpack_from('<H', m, 2)[0]
-        species = struct.unpack_from('<H', m, 4)[0]
+        iv = _U16.unpack_from(m, 0)[0]
+        level = _U16.unpack_from(m, 2)[0]
+        species = _U16.unpack_from(m, 4)[0]
         member = {'species': species, 'level': level, 'iv': iv}
         pos = 6
         if has_item:
-            member['item'] = struct.unpack_from('<H', m, pos)[0]
+            member['item'] = _U16.unpack_from(m, pos)[0]
             pos += 2
         if has_moves:
-            moves = [struct.unpack_from('<H', m, pos + j*2)[0] for j in range(4)]
+            moves = [_U16.unpack_from(m, pos + j*2)[0] for j in range(4)]
             member['moves'] = [mv for mv in moves if mv > 0]
         party.append(member)
 
@@ -1940,8 +2268,7 @@ def decode_gen4_text(data: bytes) -> list:
     if len(data) < 4:
         return []
 
-    num_entries = struct.unpack_from('<H', data, 0)[0]
-    seed = struct.unpack_from('<H', data, 2)[0]
+    num_entries, seed = _U16x2.unpack_from(data, 0)
 
     if num_entries == 0 or num_entries > 10000:
         return []
@@ -1953,15 +2280,12 @@ def decode_gen4_text(data: bytes) -> list:
     # Decrypt entry table: offset(u32) + length(u32) per entry
     # seed32 = (key * 765 * (i+1)) & 0xFFFF, replicated: seed32 |= seed32 << 16
     base_key = (seed * 0x2FD) & 0xFFFF
-    entry_data = bytearray(data[4:table_end])
+    table = struct.unpack_from(f'<{num_entries * 2}I', data, 4)
     entries = []
     for i in range(num_entries):
         key16 = (base_key * (i + 1)) & 0xFFFF
         seed32 = key16 | (key16 << 16)
-        off = i * 8
-        offset = struct.unpack_from('<I', entry_data, off)[0] ^ seed32
-        charcount = struct.unpack_from('<I', entry_data, off + 4)[0] ^ seed32
-        entries.append((offset, charcount))
+        entries.append((table[2 * i] ^ seed32, table[2 * i + 1] ^ seed32))
 
     strings = []
     for i, (offset, length) in enumerate(entries):
@@ -1970,16 +2294,10 @@ def decode_gen4_text(data: bytes) -> list:
             continue
 
         # Per-string decryption key
+        # Keystream is linear (key0 + j*0x493D), so decrypt the whole string at once
         key = ((i + 1) * 0x91BD3) & 0xFFFF
-        vals = []
-        for j in range(length):
-            pos = offset + j * 2
-            if pos + 2 > len(data):
-                break
-            enc = struct.unpack_from('<H', data, pos)[0]
-            dec = (enc ^ key) & 0xFFFF
-            key = (key + 0x493D) & 0xFFFF
-            vals.append(dec)
+        enc = struct.unpack_from(f'<{length}H', data, offset)
+        vals = [e ^ ((key + 0x493D * j) & 0xFFFF) for j, e in enumerate(enc)]
 
         # Check for 0xF100 compressed text (trainer names)
         # Algorithm from pret decomp (String_ConcatTrainerName):
@@ -2353,6 +2671,7 @@ def bootstrap_text_tables(rom, game_code: str) -> dict:
     text_narc = None
     text_mult = None
     text_gen = None
+    _refresh_text_caches()
 
     game_info = GAME_INFO.get(game_code)
     if not game_info:
@@ -2368,14 +2687,14 @@ def bootstrap_text_tables(rom, game_code: str) -> dict:
     # Start fresh — previous ROM's paths don't belong in this ROM's roles.
     # ICR-discovered roles get re-added after BFS runs.
     global narc_roles
-    narc_roles = {}
-    for role, path in game_info['narcs'].items():
-        if role != 'text':
-            narc_roles[path] = role
+    narc_roles = dict(_GAME_NARC_ROLES.get(game_code, _NO_NARCS))
 
     try:
-        narc_data = rom.getFileByName(text_narc_path)
-        text_narc = ndspy.narc.NARC(narc_data)
+        # Share the parse with _get_narc so later text NARC reads don't redo it
+        key = (game_code, text_narc_path)
+        text_narc = _narc_cache.get(key)
+        if text_narc is None:
+            text_narc = _narc_cache[key] = ndspy.narc.NARC(rom.getFileByName(text_narc_path))
     except Exception as e:
         return {"error": f"Failed to load text NARC {text_narc_path}: {e}"}
 
@@ -2399,13 +2718,12 @@ def bootstrap_text_tables(rom, game_code: str) -> dict:
         if text_mult is None:
             return {"error": "Could not derive text MULT (no species file found)"}
 
-        for i in range(file_count):
-            text_tables[i] = decode_gen5_text(text_narc.files[i], text_mult)
+        # Decoding is pure Python (GIL-bound), so files are mapped sequentially
+        text_tables.update(enumerate(map(decode_gen5_text, text_narc.files, [text_mult] * file_count)))
 
     elif gen == 4:
         # Gen IV: each file has its own seed, decode independently
-        for i in range(file_count):
-            text_tables[i] = decode_gen4_text(text_narc.files[i])
+        text_tables.update(enumerate(map(decode_gen4_text, text_narc.files)))
 
     # Auto-detect all named tables by content fingerprinting
     found = auto_detect_tables()
@@ -2453,7 +2771,7 @@ def _discover_tm_table():
     if not search_info:
         return None
     pattern, entry_count = search_info
-    arm9 = bytes(current_rom['arm9_data'])
+    arm9 = current_rom['arm9_data']
     offset = arm9.find(pattern)
     if offset < 0:
         return None
@@ -2464,7 +2782,7 @@ def _discover_tm_table():
         pos = offset + i * 2
         if pos + 2 > len(arm9):
             return None
-        move_id = struct.unpack_from('<H', arm9, pos)[0]
+        move_id = _U16.unpack_from(arm9, pos)[0]
         raw_table.append(move_id)
 
     # Build bit-ordered table: personal data bits → (label, move_id)
@@ -2541,12 +2859,12 @@ def _discover_gen3_tables():
     # (level << 9) | move_id, terminated by 0x0000.
     tackle_lv1 = struct.pack('<H', (1 << 9) | 33)  # 0x0221
     for i in range(0, min(len(rom_data) - 8, 0x800000), 4):
-        ptr = struct.unpack_from('<I', rom_data, i)[0]
+        ptr = _U32.unpack_from(rom_data, i)[0]
         if not (0x08000000 <= ptr <= 0x0A000000):
             continue
         off = ptr - 0x08000000
         if off + 2 <= len(rom_data) and rom_data[off:off+2] == tackle_lv1:
-            ptr2 = struct.unpack_from('<I', rom_data, i + 4)[0]
+            ptr2 = _U32.unpack_from(rom_data, i + 4)[0]
             if 0x08000000 <= ptr2 <= 0x0A000000:
                 off2 = ptr2 - 0x08000000
                 if off2 + 2 <= len(rom_data) and rom_data[off2:off2+2] == tackle_lv1:
@@ -2562,13 +2880,20 @@ def _discover_gen3_tables():
     return offsets if offsets else None
 
 
+# EV bitmask (low 6 bits) → stat names, and TRPoke difficulty byte → IV, precomputed
+_EV_LUT = tuple(tuple(EV_STAT_BITS[i] for i in range(6) if b & (1 << i)) or ("None",) for b in range(64))
+_IV_LUT = tuple(b * 31 // 255 for b in range(256))
+
+
 def decode_ev_spread(byte_val):
     """Decode EV bitmask: each set bit = 252 EVs in that stat."""
-    stats = [EV_STAT_BITS[i] for i in range(6) if byte_val & (1 << i)]
-    return stats if stats else ["None"]
+    return list(_EV_LUT[byte_val & 0x3F])  # only bits 0-5 name a stat
+
 
 def decode_trainer_iv(byte_val):
     """TRPoke difficulty byte → IV for all stats. 255 → 31, 0 → 0."""
+    if 0 <= byte_val < 256:
+        return _IV_LUT[byte_val]
     return byte_val * 31 // 255
 
 def get_ability_from_personal(species_id: int, ability_slot: int) -> str:
@@ -2590,7 +2915,7 @@ def get_ability_from_personal(species_id: int, ability_slot: int) -> str:
         
         personal_data = personal_narc.files[species_id]
         gen = text_gen or 5
-        ability_list = text_tables.get('abilities', [])
+        ability_list = _tt_abilities
         
         if gen <= 4:
             # Gen IV: abilities at bytes 0x16, 0x17 (u8)
@@ -2633,6 +2958,36 @@ def decode_gender(gender_byte: int, species_id: int) -> str:
         return "Random"
 
 
+# Per-record layouts — one unpack per record instead of one per field
+_TRPOKE_BASE_G4 = struct.Struct('<HHH')     # iv, level, species
+_TRPOKE_BASE_G5 = struct.Struct('<BBBxHH')  # difficulty, ability/gender, level, pad, species, form
+_U16x4 = struct.Struct('<4H')               # move IDs
+_TRDATA_HEAD = struct.Struct('<BBBB4HI')    # flags, class, battle_type, npoke, items×4, ai_flags
+_PWT_ENTRY = struct.Struct('<5HBBHH')       # species, moves×4, ev_spread, nature, item, pad
+_ENC_SLOT_G5 = struct.Struct('<HBB')        # species | form << 11, min_lv, max_lv
+_ENC_GRASS_DPP = struct.Struct('<II')       # level, species
+_ENC_WATER_DPP = struct.Struct('<BBxxH')    # max_lv, min_lv, pad, species
+_ENC_WATER_HGSS = struct.Struct('<BBH')     # min_lv, max_lv, species
+
+# Strips control/format codes from decoded nature, class and tournament names
+_NATURE_STRIP = re.compile(r'[^\x20-\x7E]+')
+
+
+@functools.lru_cache(maxsize=None)
+def _mk_struct(fmt: str) -> struct.Struct:
+    """Compiled Struct for variable-count formats like '<12H'."""
+    return struct.Struct(fmt)
+
+
+@functools.lru_cache(maxsize=None)
+def _trpoke_record(gen: int, template: int) -> struct.Struct:
+    """Whole-record Struct for a TRPoke template (base, [item], [moves×4], pad)."""
+    formats = TRPOKE_FORMATS_G4 if gen <= 4 else TRPOKE_FORMATS_G5
+    fmt = ('<HHH' if gen <= 4 else '<BBBxHH') + ('H' if template & 2 else '') + ('4H' if template & 1 else '')
+    pad = formats[template] - struct.calcsize(fmt)
+    return struct.Struct(fmt + f'{pad}x' if pad else fmt)
+
+
 def decode_trpoke(data: bytes, trainer_data: bytes = None) -> dict:
     """Decode a TRPoke file into human-readable format using text_tables.
     Gen IV: iv(u16) level(u16) species(u16) = 6B base.
@@ -2648,33 +3003,36 @@ def decode_trpoke(data: bytes, trainer_data: bytes = None) -> dict:
     if trainer_data and len(trainer_data) >= 1:
         template = trainer_data[0] & 0x03
     else:
-        # Guess from file size
-        for t in [3, 2, 1, 0]:
-            if len(data) % formats[t] == 0 and len(data) // formats[t] > 0:
-                template = t
-                break
+        # Guess from file size, largest record first (data is non-empty here)
+        size = len(data)
+        template = (3 if size % formats[3] == 0 else
+                    2 if size % formats[2] == 0 else
+                    1 if size % formats[1] == 0 else 0)
 
-    pokemon_size = formats.get(template, formats[0])
+    pokemon_size = formats[template]
     num_pokemon = len(data) // pokemon_size
 
-    species_list = text_tables.get('species', [])
-    moves_list = text_tables.get('moves', [])
-    items_list = text_tables.get('items', [])
+    species_list = _tt_species
+    moves_list = _tt_moves
+    items_list = _tt_items
 
-    pokemon = []
-    for i in range(num_pokemon):
-        off = i * pokemon_size
-        if off + pokemon_size > len(data):
-            break
+    # Template is loop-invariant: fix where the optional fields sit in each record
+    gen4 = gen <= 4
+    base_fields = 3 if gen4 else 5
+    item_at = base_fields if template & 2 else None
+    moves_at = (base_fields + (1 if template & 2 else 0)) if template & 1 else None
+    record = _trpoke_record(gen, template)
 
-        if gen <= 4:
+    n_species, n_moves, n_items = len(species_list), len(moves_list), len(items_list)
+
+    pokemon = []
+    add_pokemon = pokemon.append
+    for fields in record.iter_unpack(data[:num_pokemon * pokemon_size]):
+        if gen4:
             # Gen IV layout: iv(u16) level(u16) species(u16)
-            iv_raw = struct.unpack_from('<H', data, off)[0]
-            level = struct.unpack_from('<H', data, off + 2)[0]
-            species_id = struct.unpack_from('<H', data, off + 4)[0]
-            species_name = species_list[species_id] if species_id < len(species_list) else f"#{species_id}"
+            iv_raw, level, species_id = fields[:3]
+            species_name = species_list[species_id] if species_id < n_species else f"#{species_id}"
             ivs = iv_raw * 31 // 255 if iv_raw <= 255 else 31
-            base_size = 6
 
             entry = {
                 "species": species_name,
@@ -2684,19 +3042,14 @@ def decode_trpoke(data: bytes, trainer_data: bytes = None) -> dict:
             }
         else:
             # Gen V layout: iv(u8) ability(u8) level(u8) pad(u8) species(u16) form(u16)
-            difficulty = data[off]
-            ability_gender = data[off + 1]
-            level = data[off + 2]
-            species_id = struct.unpack_from('<H', data, off + 4)[0]
-            form = struct.unpack_from('<H', data, off + 6)[0]
+            difficulty, ability_gender, level, species_id, form = fields[:5]
 
             ability_slot = (ability_gender >> 4) & 0xF
             gender_byte = ability_gender & 0xF
-            species_name = species_list[species_id] if species_id < len(species_list) else f"#{species_id}"
+            species_name = species_list[species_id] if species_id < n_species else f"#{species_id}"
             ability_name = get_ability_from_personal(species_id, ability_slot)
             gender = decode_gender(gender_byte, species_id)
             ivs = decode_trainer_iv(difficulty)
-            base_size = 8
 
             entry = {
                 "species": species_name,
@@ -2708,21 +3061,18 @@ def decode_trpoke(data: bytes, trainer_data: bytes = None) -> dict:
                 "form": form,
             }
 
-        if template & 2:  # Has held item
-            item_id = struct.unpack_from('<H', data, off + base_size)[0]
-            item_name = items_list[item_id] if item_id < len(items_list) else f"item#{item_id}"
+        if item_at is not None:  # Has held item
+            item_id = fields[item_at]
+            item_name = items_list[item_id] if item_id < n_items else f"item#{item_id}"
             entry["held_item"] = item_name if item_id > 0 else "None"
 
-        if template & 1:  # Has moves
-            move_off = off + base_size + (2 if template & 2 else 0)
-            moves = []
-            for m in range(4):
-                mid = struct.unpack_from('<H', data, move_off + m * 2)[0]
-                mname = moves_list[mid] if mid < len(moves_list) else f"move#{mid}"
-                moves.append(mname if mid > 0 else "---")
-            entry["moves"] = moves
+        if moves_at is not None:  # Has moves
+            entry["moves"] = [
+                (moves_list[mid] if mid < n_moves else f"move#{mid}") if mid > 0 else "---"
+                for mid in fields[moves_at:moves_at + 4]
+            ]
 
-        pokemon.append(entry)
+        add_pokemon(entry)
 
     return {"template": template, "count": num_pokemon, "pokemon": pokemon, "raw": data.hex()}
 
@@ -2736,27 +3086,22 @@ def decode_trdata(data: bytes, index: int = None) -> dict:
     if len(data) < min_len:
         return None
     
-    trainer_names = text_tables.get('trainer_names', [])
-    trainer_classes = text_tables.get('trainer_classes', [])
-    items_list = text_tables.get('items', [])
+    trainer_names = _tt_trainer_names
+    trainer_classes = _tt_classes
+    items_list = _tt_items
 
     BATTLE_TYPES = {0: "Single", 1: "Double", 2: "Triple", 3: "Rotation"}
 
-    flags = data[0]
-    trainer_class = data[1]
-    battle_type = data[2]
-    num_pokemon = data[3]
+    flags, trainer_class, battle_type, num_pokemon, *item_ids, ai_flags_raw = _TRDATA_HEAD.unpack_from(data, 0)
     has_moves = bool(flags & 1)
     has_items = bool(flags & 2)
 
     battle_items = []
-    for i in range(4):
-        item_id = struct.unpack_from('<H', data, 4 + i * 2)[0]
+    for item_id in item_ids:
         if item_id > 0:
             item_name = items_list[item_id] if item_id < len(items_list) else f"item#{item_id}"
             battle_items.append(item_name)
 
-    ai_flags_raw = struct.unpack_from('<I', data, 12)[0]
     ai_flags = decode_ai_flags(ai_flags_raw, gen)
     class_name = trainer_classes[trainer_class] if trainer_class < len(trainer_classes) else f"class#{trainer_class}"
 
@@ -2829,7 +3174,7 @@ def _resolve_pwt_trainer_name(trainer_idx, trainer_role="pwt_trainers"):
     Check all candidate positions, return the first that resolves to a real leader name."""
     _JUNK = {'Pokmon Trainer', 'Boss Trainer', 'no data', 'Pokmon Trainer',
              'Team Plasma', 'GAME FREAK', 'Leader', ''}
-    classes = text_tables.get('trainer_classes', [])
+    classes = _tt_classes
     try:
         map_path = _role_path('pwt_trainer_map')
         if not map_path:
@@ -2844,12 +3189,12 @@ def _resolve_pwt_trainer_name(trainer_idx, trainer_role="pwt_trainers"):
             return None
         # Check u16[8] first (works for group 1), then u16[5], u16[6], u16[7]
         for pos in (8, 5, 6, 7):
-            cid = struct.unpack_from('<H', data, entry_off + pos * 2)[0]
+            cid = _U16.unpack_from(data, entry_off + pos * 2)[0]
             if cid == 0 or cid >= len(classes):
                 continue
             raw = classes[cid]
             if isinstance(raw, str):
-                clean = re.sub(r'[^\x20-\x7E]', '', raw).strip()
+                clean = _NATURE_STRIP.sub('', raw).strip()
                 if clean and clean not in _JUNK:
                     return clean
     except:
@@ -2879,25 +3224,16 @@ _PWT_ROSTER_POOLS = {
 }
 
 
-def decode_pwt(data: bytes, is_champions: bool = False, pool_name: str = "", pool_index: int = 0):
-    """Decode PWT/facility pokemon pool entry (16B). Returns positional text."""
-    if len(data) < 16 or data == b'\x00' * 16:
-        return None
-
-    species_list = text_tables.get('species', [])
-    moves_list = text_tables.get('moves', [])
-    natures_list = text_tables.get('natures', [])
-    items_list = text_tables.get('items', [])
-
-    species_id = struct.unpack_from('<H', data, 0)[0]
-    moves = [struct.unpack_from('<H', data, 2 + i * 2)[0] for i in range(4)]
-    ev_spread = data[10]
-    nature = data[11]
-    field12 = struct.unpack_from('<H', data, 12)[0]
+def _format_pwt_entry(species_id, moves, ev_spread, nature, field12, pool_name="", pool_index=0):
+    """Format one unpacked PWT/facility pool entry as positional text."""
+    species_list = _tt_species
+    moves_list = _tt_moves
+    natures_list = _tt_natures
+    items_list = _tt_items
 
     species_name = species_list[species_id] if species_id < len(species_list) else f"#{species_id}"
     nature_raw = natures_list[nature] if nature < len(natures_list) else ""
-    nature_name = re.sub(r'[^\x20-\x7E]', '', nature_raw).replace(' nature.', '').strip() if nature_raw else f"nature#{nature}"
+    nature_name = _NATURE_STRIP.sub('', nature_raw).replace(' nature.', '').strip() if nature_raw else f"nature#{nature}"
 
     move_names = [moves_list[m] if m < len(moves_list) else f"move#{m}" for m in moves if m != 0]
     ev_names = decode_ev_spread(ev_spread)
@@ -2911,12 +3247,50 @@ def decode_pwt(data: bytes, is_champions: bool = False, pool_name: str = "", poo
     out = [f"[{pool_name} #{pool_index}] {poke_line}" if pool_name else poke_line]
     if move_names:
         out.append(" / ".join(move_names))
-    if ev_names and ev_names != ['None']:
+    if ev_names != ['None']:
         out.append(f"EVs: {', '.join(ev_names)}")
 
     return "\n".join(out)
 
 
+def decode_pwt(data: bytes, is_champions: bool = False, pool_name: str = "", pool_index: int = 0):
+    """Decode PWT/facility pokemon pool entry (16B). Returns positional text."""
+    if len(data) < 16 or data.count(0, 0, 16) == 16:
+        return None
+    species_id, *moves, ev_spread, nature, field12, _ = _PWT_ENTRY.unpack_from(data, 0)
+    return _format_pwt_entry(species_id, moves, ev_spread, nature, field12, pool_name, pool_index)
+
+
+def decode_pwt_bulk(files, pool_name: str = ""):
+    """Decode every entry of a PWT/facility pool NARC in one pass.
+    Returns a list aligned with files: positional text, or None for short/empty entries."""
+    short = b'\x00' * 16
+    buf = b''.join(bytes(f[:16]) if len(f) >= 16 else short for f in files)
+    out = []
+    for i, fields in enumerate(_PWT_ENTRY.iter_unpack(buf)):
+        if not any(fields):
+            out.append(None)
+            continue
+        species_id, m1, m2, m3, m4, ev_spread, nature, field12, _ = fields
+        out.append(_format_pwt_entry(species_id, (m1, m2, m3, m4), ev_spread, nature, field12, pool_name, i))
+    return out
+
+
+# Pool NARC path → (NARC, resolved lines); rebuilt when the cached NARC changes
+_pwt_pool_cache = {}
+
+
+def _pwt_pool_lines(pool_narc_path):
+    """All entries of a pool NARC as single-line text (None for empty), decoded once."""
+    pool_narc = _get_narc(pool_narc_path)
+    cached = _pwt_pool_cache.get(pool_narc_path)
+    if cached and cached[0] is pool_narc:
+        return cached[1]
+    lines = [r.replace("\n", "  |  ") if r else None for r in decode_pwt_bulk(pool_narc.files)]
+    _pwt_pool_cache[pool_narc_path] = (pool_narc, lines)
+    return lines
+
+
 def _resolve_pwt_pool_entry(pool_idx, pool_narc_path=None, pool_role='pwt_champions'):
     """Resolve a PWT pool index to a single formatted pokemon line."""
     try:
@@ -2924,14 +3298,10 @@ def _resolve_pwt_pool_entry(pool_idx, pool_narc_path=None, pool_role='pwt_champi
             pool_narc_path = _role_path(pool_role)
         if not pool_narc_path:
             return None
-        pool_narc = _get_narc(pool_narc_path)
-        if pool_idx >= len(pool_narc.files):
-            return None
-        pdata = bytes(pool_narc.files[pool_idx])
-        result = decode_pwt(pdata)
-        if not result:
+        lines = _pwt_pool_lines(pool_narc_path)
+        if pool_idx >= len(lines):
             return None
-        return result.replace("\n", "  |  ")
+        return lines[pool_idx]
     except:
         return None
 
@@ -2940,16 +3310,10 @@ def decode_pwt_roster(data: bytes, slot_index: int = 0, roster_role: str = "pwt_
     """Decode PWT/facility roster with resolved pokemon. Returns positional text."""
     if len(data) < 4:
         return None
-    fmt = struct.unpack_from('<H', data, 0)[0]
-    count = struct.unpack_from('<H', data, 2)[0]
+    fmt, count = _U16x2.unpack_from(data, 0)
     if count == 0 and fmt == 0:
         return None
-    indices = []
-    for i in range(count):
-        off = 4 + i * 2
-        if off + 2 > len(data):
-            break
-        indices.append(struct.unpack_from('<H', data, off)[0])
+    indices = _mk_struct(f'<{min(count, (len(data) - 4) // 2)}H').unpack_from(data, 4)
     label = roster_role.replace('pwt_', '').replace('_', ' ').title()
     out = [f"{label} Roster #{slot_index} | {count} Pokémon"]
     pool_role = _PWT_ROSTER_POOLS.get(roster_role, 'pwt_rental')
@@ -2967,9 +3331,7 @@ def decode_pwt_trainer_config(data: bytes, slot_index: int = 0, trainer_role: st
     """Decode PWT trainer config (6B) with resolved roster + pokemon. Returns positional text."""
     if len(data) < 6:
         return None
-    fmt = struct.unpack_from('<H', data, 0)[0]
-    count = struct.unpack_from('<H', data, 2)[0]
-    start_idx = struct.unpack_from('<H', data, 4)[0]
+    fmt, count, start_idx = _mk_struct('<3H').unpack_from(data, 0)
     if fmt == 0 and count == 0 and start_idx == 0:
         return None
     trainer_name = _resolve_pwt_trainer_name(slot_index, trainer_role)
@@ -2990,12 +3352,8 @@ def decode_pwt_trainer_config(data: bytes, slot_index: int = 0, trainer_role: st
                 if slot_index < len(roster_narc.files):
                     rd = bytes(roster_narc.files[slot_index])
                     if len(rd) >= 4:
-                        r_count = struct.unpack_from('<H', rd, 2)[0]
-                        indices = []
-                        for i in range(r_count):
-                            off = 4 + i * 2
-                            if off + 2 <= len(rd):
-                                indices.append(struct.unpack_from('<H', rd, off)[0])
+                        r_count = min(_U16.unpack_from(rd, 2)[0], (len(rd) - 4) // 2)
+                        indices = _mk_struct(f'<{r_count}H').unpack_from(rd, 4)
                         for pi in indices:
                             line = _resolve_pwt_pool_entry(pi, pool_narc_path=pool_path)
                             if line:
@@ -3012,7 +3370,7 @@ def _resolve_pwt_text(tournament_id):
     if tournament_id < len(names):
         raw = names[tournament_id]
         if isinstance(raw, str):
-            clean = re.sub(r'[^\x20-\x7E]', '', raw).strip()
+            clean = _NATURE_STRIP.sub('', raw).strip()
             if clean and clean != '???':
                 return clean
     return None
@@ -3023,23 +3381,23 @@ def decode_pwt_tournament_def(data: bytes, file_idx: int = 0):
     if len(data) < 0x60:
         return None
     # Header
-    tid = struct.unpack_from('<H', data, 0)[0]
-    category = struct.unpack_from('<H', data, 2)[0]
-    trainer_count = struct.unpack_from('<H', data, 4)[0]
-    battle_format = struct.unpack_from('<H', data, 6)[0]
-    pool_type = struct.unpack_from('<H', data, 8)[0]
-    cfg5 = struct.unpack_from('<H', data, 0x0A)[0]
-    cfg6 = struct.unpack_from('<H', data, 0x0C)[0]
-    cfg7 = struct.unpack_from('<H', data, 0x0E)[0]
-    cfg8 = struct.unpack_from('<H', data, 0x10)[0]
-    flag1 = struct.unpack_from('<H', data, 0x12)[0]
-    flag2 = struct.unpack_from('<H', data, 0x14)[0]
+    tid = _U16.unpack_from(data, 0)[0]
+    category = _U16.unpack_from(data, 2)[0]
+    trainer_count = _U16.unpack_from(data, 4)[0]
+    battle_format = _U16.unpack_from(data, 6)[0]
+    pool_type = _U16.unpack_from(data, 8)[0]
+    cfg5 = _U16.unpack_from(data, 0x0A)[0]
+    cfg6 = _U16.unpack_from(data, 0x0C)[0]
+    cfg7 = _U16.unpack_from(data, 0x0E)[0]
+    cfg8 = _U16.unpack_from(data, 0x10)[0]
+    flag1 = _U16.unpack_from(data, 0x12)[0]
+    flag2 = _U16.unpack_from(data, 0x14)[0]
 
     BATTLE_TYPES = {1: "Single", 2: "Double", 3: "Triple", 4: "Rotation"}
     bt = BATTLE_TYPES.get(battle_format, f"Type {battle_format}")
 
-    music_a = struct.unpack_from('<H', data, 0x18)[0]
-    music_b = struct.unpack_from('<H', data, 0x1A)[0]
+    music_a = _U16.unpack_from(data, 0x18)[0]
+    music_b = _U16.unpack_from(data, 0x1A)[0]
 
     # Tournament ID indexes directly into the tournament_names text table (file 405)
     tournament_name = _resolve_pwt_text(tid) or f"Tournament #{tid}"
@@ -3058,7 +3416,7 @@ def decode_pwt_tournament_def(data: bytes, file_idx: int = 0):
         if len(data) < region_end:
             continue
         for off in range(region_start, region_end, 2):
-            val = struct.unpack_from('<H', data, off)[0]
+            val = _U16.unpack_from(data, off)[0]
             if 1 <= val <= 68:
                 trainer_indices.add(val)
 
@@ -3076,8 +3434,8 @@ def decode_pwt_tournament_def(data: bytes, file_idx: int = 0):
                         continue
                     rd = bytes(roster_narc.files[ti])
                     if len(rd) >= 6:
-                        r_count = struct.unpack_from('<H', rd, 2)[0]
-                        first_pool = struct.unpack_from('<H', rd, 4)[0]
+                        r_count = _U16.unpack_from(rd, 2)[0]
+                        first_pool = _U16.unpack_from(rd, 4)[0]
                         line = _resolve_pwt_pool_entry(first_pool, pool_narc_path=pool_path)
                         if line:
                             species_part = line.split('|')[0].strip()
@@ -3104,23 +3462,25 @@ GENDER_RATIOS = {
     254: "100% ♀", 255: "Genderless",
 }
 
+# hp, atk, def, spe, spa, spd, type1, type2, catch_rate, (pad), ev_yield — same in Gen IV/V
+_PERSONAL_HEAD = struct.Struct('<9BxH')
+_PERSONAL_ITEMS_G4 = struct.Struct('<2H')  # common, rare at 0x0C
+_PERSONAL_ITEMS_G5 = struct.Struct('<3H')  # common, rare, hidden at 0x0C
+
+
 def decode_personal(data: bytes, file_idx: int = 0):
     """Decode personal data. Gen IV=44B, Gen V=76B. Returns positional text."""
-    if len(data) < 28 or data == b'\x00' * len(data):
+    if len(data) < 28 or data.count(0) == len(data):
         return None
     gen = text_gen or 5
-    species_list = text_tables.get('species', [])
-    type_list = text_tables.get('type_names', [])
-    ability_list = text_tables.get('abilities', [])
-    item_list = text_tables.get('items', [])
+    species_list = _tt_species
+    type_list = _tt_types
+    ability_list = _tt_abilities
+    item_list = _tt_items
 
     # Base stats (identical layout across Gen IV/V)
-    hp, atk, dfn, spe, spa, spd = data[0], data[1], data[2], data[3], data[4], data[5]
+    hp, atk, dfn, spe, spa, spd, type1, type2, catch_rate, ev_raw = _PERSONAL_HEAD.unpack_from(data, 0)
     bst = hp + atk + dfn + spe + spa + spd
-    type1, type2 = data[6], data[7]
-    catch_rate = data[8]
-
-    ev_raw = struct.unpack_from('<H', data, 0x0A)[0]
     evs = []
     for i, stat in enumerate(EV_YIELD_STATS):
         val = (ev_raw >> (i * 2)) & 3
@@ -3128,7 +3488,7 @@ def decode_personal(data: bytes, file_idx: int = 0):
             evs.append(f"+{val} {stat}")
 
     if gen <= 4:
-        items = [struct.unpack_from('<H', data, 0x0C + i * 2)[0] for i in range(2)]
+        items = _PERSONAL_ITEMS_G4.unpack_from(data, 0x0C)
         held_labels = ['common', 'rare']
         gender = data[0x10]
         hatch_cycles = data[0x11]
@@ -3138,7 +3498,7 @@ def decode_personal(data: bytes, file_idx: int = 0):
         abilities = [data[0x16], data[0x17]]
         ability_names = [ability_list[a] if a < len(ability_list) else f"ability#{a}" for a in abilities if a > 0]
     else:
-        items = [struct.unpack_from('<H', data, 0x0C + i * 2)[0] for i in range(3)]
+        items = _PERSONAL_ITEMS_G5.unpack_from(data, 0x0C)
         held_labels = ['common', 'rare', 'hidden']
         gender = data[0x12]
         hatch_cycles = data[0x13]
@@ -3183,13 +3543,13 @@ def decode_personal(data: bytes, file_idx: int = 0):
 
     # Height/weight (Gen V only, at 0x24/0x26)
     if gen >= 5 and len(data) >= 0x28:
-        height_dm = struct.unpack_from('<H', data, 0x24)[0]
-        weight_hg = struct.unpack_from('<H', data, 0x26)[0]
+        height_dm = _U16.unpack_from(data, 0x24)[0]
+        weight_hg = _U16.unpack_from(data, 0x26)[0]
         lines.append(f"Height: {height_dm / 10.0}m | Weight: {weight_hg / 10.0}kg")
 
     # TM/HM compatibility
     if tm_table:
-        moves_list = text_tables.get('moves', [])
+        moves_list = _tt_moves
         tm_offset = 0x1C if gen <= 4 else 0x28
         if len(data) >= tm_offset + 16:
             tm_flags = data[tm_offset:tm_offset + 16]
@@ -3217,28 +3577,29 @@ def decode_learnset(data: bytes, file_idx: int = 0):
     if len(data) < 2:
         return None
     gen = text_gen or 5
-    species_list = text_tables.get('species', [])
-    moves_list = text_tables.get('moves', [])
+    species_list = _tt_species
+    moves_list = _tt_moves
     species_name = species_list[file_idx] if file_idx < len(species_list) else f"#{file_idx}"
 
+    n_moves = len(moves_list)
     moves = []
+    add_move = moves.append
     if gen <= 4:
-        for i in range(0, len(data) - 1, 2):
-            raw = struct.unpack_from('<H', data, i)[0]
+        # level(7) << 9 | move(9) per u16, 0xFFFF-terminated
+        for raw in _mk_struct(f'<{len(data) // 2}H').unpack_from(data, 0):
             if raw == 0xFFFF:
                 break
             move_id = raw & 0x1FF
             level = (raw >> 9) & 0x7F
-            move_name = moves_list[move_id] if move_id < len(moves_list) else f"move#{move_id}"
-            moves.append((level, move_name))
+            move_name = moves_list[move_id] if move_id < n_moves else f"move#{move_id}"
+            add_move((level, move_name))
     else:
-        for i in range(0, len(data) - 3, 4):
-            move_id = struct.unpack_from('<H', data, i)[0]
-            level = struct.unpack_from('<H', data, i + 2)[0]
+        # move(u16) level(u16) pairs, 0xFFFF-terminated
+        for move_id, level in _U16x2.iter_unpack(data[:len(data) // 4 * 4]):
             if move_id == 0xFFFF:
                 break
-            move_name = moves_list[move_id] if move_id < len(moves_list) else f"move#{move_id}"
-            moves.append((level, move_name))
+            move_name = moves_list[move_id] if move_id < n_moves else f"move#{move_id}"
+            add_move((level, move_name))
 
     lines = [f"{species_name} (#{file_idx}) — Learnset"]
     for level, move_name in moves:
@@ -3259,35 +3620,47 @@ EVOLUTION_METHODS = {
     27: "level_icy_rock_2", 28: "level_dark", 29: "spin", 30: "level_rain",
 }
 
+_EVO_ALL = struct.Struct('<21H')  # 7 slots × (method, param, target)
+
+# Evolution method → what its param means
+_EVO_PARAM_KIND = {
+    **dict.fromkeys((4, 9, 10, 11, 21, 22, 23, 24, 25, 26, 27, 28), 'level'),
+    **dict.fromkeys((6, 8, 17, 18), 'item'),
+    19: 'move',
+    7: 'species', 20: 'species',
+}
+
+
 def decode_evolution(data: bytes, file_idx: int = 0):
     """Decode evolution table. Returns positional text."""
-    if len(data) < 42 or data[:42] == b'\x00' * 42:
+    if len(data) < 42 or data.count(0, 0, 42) == 42:
         return None
-    species_list = text_tables.get('species', [])
-    item_list = text_tables.get('items', [])
-    moves_list = text_tables.get('moves', [])
+    species_list = _tt_species
+    item_list = _tt_items
+    moves_list = _tt_moves
     species_name = species_list[file_idx] if file_idx < len(species_list) else f"#{file_idx}"
+    n_species = len(species_list)
     evo_lines = []
-    for i in range(7):
-        off = i * 6
-        method = struct.unpack_from('<H', data, off)[0]
-        param = struct.unpack_from('<H', data, off + 2)[0]
-        target = struct.unpack_from('<H', data, off + 4)[0]
+    add_line = evo_lines.append
+    slots = _EVO_ALL.unpack_from(data, 0)
+    for off in range(0, 21, 3):
+        method, param, target = slots[off:off + 3]
         if method == 0 and target == 0:
             continue
         method_name = EVOLUTION_METHODS.get(method, f"method#{method}")
-        target_name = species_list[target] if target < len(species_list) else f"#{target}"
+        target_name = species_list[target] if target < n_species else f"#{target}"
         # Build condition string
-        if method in (4, 9, 10, 11, 21, 22, 23, 24, 25, 26, 27, 28):
+        kind = _EVO_PARAM_KIND.get(method)
+        if kind == 'level':
             cond = f"Lv{param}" if method == 4 else f"Lv{param}, {method_name}"
-        elif method in (6, 8, 17, 18):
+        elif kind == 'item':
             item_name = item_list[param] if param < len(item_list) else f"item#{param}"
             cond = item_name
-        elif method == 19:
+        elif kind == 'move':
             move_name = moves_list[param] if param < len(moves_list) else f"move#{param}"
             cond = f"knows {move_name}"
-        elif method in (7, 20):
-            sp = species_list[param] if param < len(species_list) else f"#{param}"
+        elif kind == 'species':
+            sp = species_list[param] if param < n_species else f"#{param}"
             cond = f"trade for {sp}" if method == 7 else f"with {sp} in party"
         elif method in (1, 2, 3):
             cond = method_name
@@ -3299,7 +3672,7 @@ def decode_evolution(data: bytes, file_idx: int = 0):
             cond = "spin"
         else:
             cond = f"{method_name}" + (f" ({param})" if param else "")
-        evo_lines.append(f"  → {target_name} ({cond})")
+        add_line(f"  → {target_name} ({cond})")
     if not evo_lines:
         return None
     lines = [f"{species_name} (#{file_idx}) — Evolutions"] + evo_lines
@@ -3311,11 +3684,11 @@ MOVE_CATEGORIES_G4 = {0: "Physical", 1: "Special", 2: "Status"}
 
 def decode_move_data(data: bytes, file_idx: int = 0):
     """Decode move data. Returns positional text."""
-    if data == b'\x00' * len(data):
+    if data.count(0) == len(data):
         return None
     gen = text_gen or 5
-    type_list = text_tables.get('type_names', [])
-    moves_list = text_tables.get('moves', [])
+    type_list = _tt_types
+    moves_list = _tt_moves
     move_name = moves_list[file_idx] if file_idx < len(moves_list) else f"move#{file_idx}"
 
     if gen == 3 and len(data) >= 9:
@@ -3411,6 +3784,24 @@ def _decode_encounters_gen5(data: bytes) -> dict:
     seasons = []
     season_names = ['Spring', 'Summer', 'Fall', 'Winter']
     num_seasons = len(data) // 232
+    species_list = _tt_species
+
+    def read_entries(season_data, offset, count, species_list=species_list):
+        entries = []
+        n_species = len(species_list)
+        for raw, min_lv, max_lv in _ENC_SLOT_G5.iter_unpack(season_data[offset:offset + count * 4]):
+            species_id = raw & 0x7FF
+            form = raw >> 11
+            if species_id == 0:
+                continue
+            name = species_list[species_id] if species_id < n_species else f"#{species_id}"
+            form_label = _FORM_NAMES.get((species_id, form))
+            if form_label is None and form > 0:
+                form_label = f"Form {form}"
+            if form_label:
+                name += f" ({form_label})"
+            entries.append({"species": name, "level": f"{min_lv}-{max_lv}" if min_lv != max_lv else str(min_lv)})
+        return entries
 
     for season_idx in range(num_seasons):
         season_data = data[season_idx * 232:(season_idx + 1) * 232]
@@ -3421,28 +3812,6 @@ def _decode_encounters_gen5(data: bytes) -> dict:
             "fishing": season_data[5], "special_fishing": season_data[6]
         }
 
-        def read_entries(offset, count):
-            entries = []
-            for j in range(count):
-                pos = offset + j * 4
-                if pos + 4 > len(season_data):
-                    break
-                raw = struct.unpack_from("<H", season_data, pos)[0]
-                species_id = raw & 0x7FF
-                form = raw >> 11
-                min_lv = season_data[pos + 2]
-                max_lv = season_data[pos + 3]
-                if species_id == 0:
-                    continue
-                name = get_text("species", species_id)
-                form_label = _FORM_NAMES.get((species_id, form))
-                if form_label is None and form > 0:
-                    form_label = f"Form {form}"
-                if form_label:
-                    name += f" ({form_label})"
-                entries.append({"species": name, "level": f"{min_lv}-{max_lv}" if min_lv != max_lv else str(min_lv)})
-            return entries
-
         result = {"rates": {k: v for k, v in rates.items() if v > 0}}
 
         groups = [
@@ -3452,7 +3821,7 @@ def _decode_encounters_gen5(data: bytes) -> dict:
         ]
         for name, offset, count in groups:
             if rates.get(name, 0) > 0:
-                entries = read_entries(offset, count)
+                entries = read_entries(season_data, offset, count)
                 if entries:
                     result[name] = entries
 
@@ -3475,16 +3844,15 @@ def _decode_encounters_dpp(data: bytes) -> dict:
     result = {}
 
     # Grass rate at offset 0, slots at offset 4
-    grass_rate = struct.unpack_from("<I", data, 0)[0]
+    grass_rate = _U32.unpack_from(data, 0)[0]
     if grass_rate > 0:
         grass = []
         for i in range(12):
             pos = 4 + i * 8
-            level = struct.unpack_from("<I", data, pos)[0]
-            species_id = struct.unpack_from("<I", data, pos + 4)[0]
+            level, species_id = _ENC_GRASS_DPP.unpack_from(data, pos)
             if species_id == 0:
                 continue
-            grass.append({"species": get_text("species", species_id), "level": level})
+            grass.append({"species": _species_name(species_id), "level": level})
         if grass:
             result["grass"] = grass
             result["grass_rate"] = grass_rate
@@ -3492,10 +3860,9 @@ def _decode_encounters_dpp(data: bytes) -> dict:
     # Replacement species (offset 100): swarm(2), day(2), night(2), radar(4)
     def read_replacements(offset, count):
         species = []
-        for i in range(count):
-            sid = struct.unpack_from("<I", data, offset + i * 4)[0]
+        for sid in _mk_struct(f'<{count}I').unpack_from(data, offset):
             if sid > 0:
-                species.append(get_text("species", sid))
+                species.append(_species_name(sid))
         return species
 
     swarm = read_replacements(100, 2)
@@ -3516,18 +3883,16 @@ def _decode_encounters_dpp(data: bytes) -> dict:
     water_names = ["surf", "surf_special", "old_rod", "good_rod", "super_rod"]
     water_offset = 204
     for section_name in water_names:
-        rate = struct.unpack_from("<I", data, water_offset)[0]
+        rate = _U32.unpack_from(data, water_offset)[0]
         water_offset += 4
         if rate > 0:
             entries = []
             for i in range(5):
                 pos = water_offset + i * 8
-                max_lv = data[pos]
-                min_lv = data[pos + 1]
-                species_id = struct.unpack_from("<H", data, pos + 4)[0]
+                max_lv, min_lv, species_id = _ENC_WATER_DPP.unpack_from(data, pos)
                 if species_id == 0:
                     continue
-                name = get_text("species", species_id)
+                name = _species_name(species_id)
                 lvl = f"{min_lv}-{max_lv}" if min_lv != max_lv else str(min_lv)
                 entries.append({"species": name, "level": lvl})
             if entries:
@@ -3561,11 +3926,10 @@ def _decode_encounters_hgss(data: bytes) -> dict:
         for t_idx, t_name in enumerate(["morning", "day", "night"]):
             base = 20 + t_idx * 24  # 12 species × 2 bytes = 24
             species = []
-            for i in range(12):
-                sid = struct.unpack_from("<H", data, base + i * 2)[0]
+            for i, sid in enumerate(_mk_struct('<12H').unpack_from(data, base)):
                 if sid == 0:
                     continue
-                species.append({"species": get_text("species", sid), "level": levels[i]})
+                species.append({"species": _species_name(sid), "level": levels[i]})
             if species:
                 tables[t_name] = species
         if tables:
@@ -3574,10 +3938,9 @@ def _decode_encounters_hgss(data: bytes) -> dict:
 
     # Sound species at offset 92 (Hoenn Sound × 2, Sinnoh Sound × 2)
     sound_species = []
-    for i in range(4):
-        sid = struct.unpack_from("<H", data, 92 + i * 2)[0]
+    for sid in _U16x4.unpack_from(data, 92):
         if sid > 0:
-            sound_species.append(get_text("species", sid))
+            sound_species.append(_species_name(sid))
     if sound_species:
         result["sound"] = {"hoenn": sound_species[:2], "sinnoh": sound_species[2:]}
 
@@ -3586,13 +3949,11 @@ def _decode_encounters_hgss(data: bytes) -> dict:
         entries = []
         for i in range(count):
             pos = offset + i * 4
-            min_lv = data[pos]
-            max_lv = data[pos + 1]
-            species_id = struct.unpack_from("<H", data, pos + 2)[0]
+            min_lv, max_lv, species_id = _ENC_WATER_HGSS.unpack_from(data, pos)
             if species_id == 0:
                 continue
             lvl = f"{min_lv}-{max_lv}" if min_lv != max_lv else str(min_lv)
-            entries.append({"species": get_text("species", species_id), "level": lvl})
+            entries.append({"species": _species_name(species_id), "level": lvl})
         return entries
 
     if surf_rate > 0:
@@ -3625,7 +3986,7 @@ def _decode_encounters_hgss(data: bytes) -> dict:
 
 def decode_items(data: bytes, file_idx: int = 0):
     """Decode item data. Gen IV: 34 bytes, price direct. Gen V: 36 bytes, price * 10."""
-    items_list = text_tables.get('items', [])
+    items_list = _tt_items
     desc_list = text_tables.get('item_descriptions', [])
 
     name = items_list[file_idx] if file_idx < len(items_list) else f'Item #{file_idx}'
@@ -3634,7 +3995,7 @@ def decode_items(data: bytes, file_idx: int = 0):
     if len(data) < 10:
         return None
 
-    raw_price = struct.unpack_from('<H', data, 0)[0]
+    raw_price = _U16.unpack_from(data, 0)[0]
     is_gen5 = len(data) >= 36
     price = raw_price * 10 if is_gen5 else raw_price
 
@@ -3663,8 +4024,8 @@ def decode_contest(data: bytes, file_idx: int = 0):
     if file_idx != 0 or len(data) < 96:
         return None
 
-    species_list = text_tables.get('species', [])
-    moves_list = text_tables.get('moves', [])
+    species_list = _tt_species
+    moves_list = _tt_moves
 
     num_entries = len(data) // 96
     lines = ["Contest Hall", "", f"Pokemon: {num_entries}"]
@@ -3673,14 +4034,14 @@ def decode_contest(data: bytes, file_idx: int = 0):
         offset = i * 96
         entry_data = data[offset:offset + 96]
 
-        species_id = struct.unpack_from('<H', entry_data, 8)[0]
+        species_id = _U16.unpack_from(entry_data, 8)[0]
         if species_id == 0 or species_id >= len(species_list):
             continue
 
         species_name = species_list[species_id]
         moves = []
         for m in range(4):
-            move_id = struct.unpack_from('<H', entry_data, 12 + m * 2)[0]
+            move_id = _U16.unpack_from(entry_data, 12 + m * 2)[0]
             if move_id > 0 and move_id < len(moves_list):
                 moves.append(moves_list[move_id])
 
@@ -3700,7 +4061,7 @@ def decode_pokeathlon_performance(data: bytes, file_idx: int = 0):
         return None
 
     species_idx = file_idx + 1
-    species_list = text_tables.get('species', [])
+    species_list = _tt_species
     species_name = species_list[species_idx] if species_idx < len(species_list) else f"#{species_idx}"
 
     parts = []
@@ -3998,8 +4359,8 @@ def format_encounter(decoded, file_idx):
 def format_trainer(file_idx):
     """Eagerly load trdata + trpoke and format as positional text."""
     # Use narc_roles (built from GAME_INFO at bootstrap or auto-discovery)
-    td_path = next((p for p, r in narc_roles.items() if r == 'trdata'), None)
-    tp_path = next((p for p, r in narc_roles.items() if r == 'trpoke'), None)
+    td_path = _role_path('trdata')
+    tp_path = _role_path('trpoke')
     if not td_path or not tp_path:
         return None
 
@@ -4021,13 +4382,13 @@ def format_trainer(file_idx):
         template = td_data[0] & 0x03
         gen = text_gen or 5
         _fmts = TRPOKE_FORMATS_G4 if gen <= 4 else TRPOKE_FORMATS_G5
-        poke_size = _fmts.get(template, _fmts[0])
+        poke_size = _fmts[template]
         num_pokemon = len(tp_data) // poke_size
         prize = 0
         if num_pokemon > 0:
             last_off = (num_pokemon - 1) * poke_size
             if gen <= 4:
-                last_level = struct.unpack_from('<H', tp_data, last_off + 2)[0]
+                last_level = _U16.unpack_from(tp_data, last_off + 2)[0]
             else:
                 last_level = tp_data[last_off + 2]
             prize = trdata.get("reward_multiplier", 0) * last_level * 4
@@ -4134,15 +4495,58 @@ def format_trainer(file_idx):
         return f"[format_trainer error] {e}\n{traceback.format_exc()}"
 
 
+_HEX_STRIP = str.maketrans('', '', ' \t\r\n')  # whitespace dropped from hex arguments before bytes.fromhex
+_ASCII_LUT = bytes(b if 32 <= b < 127 else 0x2E for b in range(256))  # printable ASCII kept, rest -> '.'
+
+
 def _format_hex(data: bytes, base_offset: int = 0) -> str:
     """Format bytes as readable hex dump: offset | hex | ascii."""
-    lines = []
-    for i in range(0, len(data), 16):
-        chunk = data[i:i + 16]
-        hex_part = ' '.join(f'{b:02X}' for b in chunk)
-        ascii_part = ''.join(chr(b) if 32 <= b < 127 else '.' for b in chunk)
-        lines.append(f"{base_offset + i:08X}  {hex_part:<48}  {ascii_part}")
-    return '\n'.join(lines)
+    # Both columns are converted for the whole buffer in one C call each, then sliced per
+    # line: byte i is at hex_text[3*i:3*i+2] and ascii_text[i].
+    hex_text = data.hex(' ').upper()
+    ascii_text = data.translate(_ASCII_LUT).decode('ascii')
+    return '\n'.join(
+        f"{base_offset + i:08X}  {hex_text[3 * i:3 * i + 47]:<48}  {ascii_text[i:i + 16]}"
+        for i in range(0, len(data), 16))
+
+
+def _raw_rom_data() -> bytearray:
+    """In-memory image of the active GBA/GB/GBC ROM (loaded at spotlight; read from disk if missing)."""
+    data = current_rom.get('data')
+    if data is None:
+        with open(current_rom['path'], 'rb') as f:
+            data = current_rom['data'] = bytearray(f.read())
+    return data
+
+
+def _find_all(data, pattern: bytes) -> list:
+    """Every offset of pattern in data, overlapping matches included."""
+    if pattern and not any(pattern[:k] == pattern[-k:] for k in range(1, len(pattern))):
+        # Pattern can't overlap itself, so one regex scan finds every match
+        return [m.start() for m in re.finditer(re.escape(pattern), data)]
+    offsets = []
+    pos = data.find(pattern)
+    while pos >= 0:
+        offsets.append(pos)
+        pos = data.find(pattern, pos + 1)
+    return offsets
+
+
+def _find_all_in_files(files: list, pattern: bytes) -> list:
+    """[(file_index, offsets)] for every file containing pattern, in file order.
+    Scans all files as one joined buffer (one C pass instead of a Python call per file)
+    and drops matches that straddle two files.
+    """
+    if not pattern:
+        return [(idx, _find_all(fdata, pattern)) for idx, fdata in enumerate(files)]
+    ends = list(itertools.accumulate(map(len, files)))
+    hits = {}
+    for pos in _find_all(b''.join(files), pattern):
+        idx = bisect.bisect_right(ends, pos)
+        start = ends[idx - 1] if idx else 0
+        if pos + len(pattern) <= ends[idx]:
+            hits.setdefault(idx, []).append(pos - start)
+    return list(hits.items())
 
 
 def _notes_for_path(path: str) -> str:
@@ -4165,6 +4569,64 @@ def _notes_for_path(path: str) -> str:
     return '\n'.join(hits)
 
 
+def _auto_decode_encounters(data: bytes, file_idx: int, role: str):
+    """Decode an encounter file and attach its location name."""
+    decoded = decode_encounters(data)
+    if not decoded:
+        return None
+    # Resolve location name -- use game-specific mapping
+    gc = current_rom['header']['game_code'] if current_rom else ''
+    loc_id = 0
+    # Auto-built table from BFS (preferred — no hardcoding)
+    auto_table = _auto_enc_loc.get(gc, {})
+    if auto_table:
+        loc_id = auto_table.get(file_idx, 0)
+    elif gc in ('ADA', 'APA'):  # Diamond / Pearl — ARM9 table
+        arm9 = current_rom.get('arm9_data')
+        if arm9 and 0xED738 + file_idx * 2 + 2 <= len(arm9):
+            loc_id = _U16.unpack_from(arm9, 0xED738 + file_idx * 2)[0]
+    else:
+        # No auto-built table and not DP ARM9 — BFS didn't find zone headers
+        pass
+    if loc_id:
+        location_names = text_tables.get('location_names', [])
+        decoded['location'] = location_names[loc_id] if loc_id < len(location_names) else f'Area #{file_idx}'
+    else:
+        decoded['location'] = f'Area #{file_idx}'
+    formatted = format_encounter(decoded, file_idx)
+    return formatted if formatted else decoded
+
+
+def _auto_decode_pwt_pool(data: bytes, file_idx: int, role: str):
+    """Decode a PWT rental/champion/mix pool entry, labelled by its pool."""
+    pool = role[4:].replace('_b', '-B').replace('_', ' ').title()
+    return decode_pwt(data, 'champions' in role, pool, file_idx)
+
+
+# NARC role → decoder(data, file_idx, role). Other pwt_rosters*/pwt_trainers*
+# variants fall back to those entries by prefix in _auto_decode.
+_ROLE_DISPATCH = {
+    'trpoke':                 lambda data, file_idx, role: format_trainer(file_idx),
+    'trdata':                 lambda data, file_idx, role: format_trainer(file_idx),
+    'personal':               lambda data, file_idx, role: decode_personal(data, file_idx),
+    'learnsets':              lambda data, file_idx, role: decode_learnset(data, file_idx),
+    'evolutions':             lambda data, file_idx, role: decode_evolution(data, file_idx),
+    'move_data':              lambda data, file_idx, role: decode_move_data(data, file_idx),
+    'encounters':             _auto_decode_encounters,
+    'pwt_defs':               lambda data, file_idx, role: decode_pwt_tournament_def(data, file_idx),
+    'pwt_rosters':            lambda data, file_idx, role: decode_pwt_roster(data, file_idx, roster_role=role),
+    'pwt_trainers':           lambda data, file_idx, role: decode_pwt_trainer_config(data, file_idx, trainer_role=role),
+    **dict.fromkeys(_PWT_POOL_ROLES, _auto_decode_pwt_pool),
+    'subway_pokemon':         lambda data, file_idx, role: decode_pwt(data, False, 'Battle Subway', file_idx),
+    'subway_trainers':        lambda data, file_idx, role: decode_pwt_roster(data, file_idx, roster_role='subway_trainers'),
+    'battle_tower_pokemon':   lambda data, file_idx, role: decode_pwt(data, True, 'Battle Tower', file_idx),
+    'battle_tower_trainers':  lambda data, file_idx, role: decode_pwt_roster(data, file_idx, roster_role='battle_tower_trainers'),
+    'pokeathlon_performance': lambda data, file_idx, role: decode_pokeathlon_performance(data, file_idx),
+    'contest':                lambda data, file_idx, role: decode_contest(data, file_idx),
+    'items':                  lambda data, file_idx, role: decode_items(data, file_idx),
+}
+
+
 def _auto_decode(path: str, data: bytes, _rom=None):
     """Auto-decode known structures by role, not hardcoded paths."""
     # GBA/GB/GBC: binary ROM — role:key paths, no NARCs
@@ -4201,8 +4663,8 @@ def _auto_decode(path: str, data: bytes, _rom=None):
                 name_off = rom_data.find(name_bytes, search_start)
                 if name_off < 4: break
                 chunk = rom_data[name_off - 4: name_off + 36]
-                count_v = struct.unpack_from('<I', chunk, 32)[0]
-                ptr_v   = struct.unpack_from('<I', chunk, 36)[0]
+                count_v = _U32.unpack_from(chunk, 32)[0]
+                ptr_v   = _U32.unpack_from(chunk, 36)[0]
                 if chunk[0] <= 3 and chunk[1] < 200 and 1 <= count_v <= 6 and 0x08000000 <= ptr_v <= 0x0AFFFFFF:
                     entry_offset = name_off - 4
                     break
@@ -4211,8 +4673,8 @@ def _auto_decode(path: str, data: bytes, _rom=None):
                 return {"_unknown": True, "reason": f"Trainer not found: {key}"}
             header = rom_data[entry_offset: entry_offset + 40]
             flags = header[0]
-            party_count = struct.unpack_from('<I', header, 32)[0]
-            party_ptr   = struct.unpack_from('<I', header, 36)[0]
+            party_count = _U32.unpack_from(header, 32)[0]
+            party_ptr   = _U32.unpack_from(header, 36)[0]
             party_off   = party_ptr - 0x08000000 if party_ptr >= 0x08000000 else 0
             has_moves, has_item = bool(flags & 1), bool(flags & 2)
             msize = 18 if (has_moves and has_item) else 16 if has_moves else 8
@@ -4227,14 +4689,14 @@ def _auto_decode(path: str, data: bytes, _rom=None):
                 (i for i, n in enumerate(text_tables.get('species', [])) if n.strip().upper() == key.upper()), -1)
             if idx < 0:
                 return {"_unknown": True, "reason": f"Species not found: {key}"}
-            ptr = struct.unpack_from('<I', rom_data, ptr_table + idx * 4)[0]
+            ptr = _U32.unpack_from(rom_data, ptr_table + idx * 4)[0]
             off = ptr - 0x08000000
             moves_list = text_tables.get('moves', [])
             sp_name = (text_tables.get('species') or [f'#{idx}'])[idx] if idx < len(text_tables.get('species', [])) else f'#{idx}'
             lines = [f"{sp_name} (#{idx}) — Learnset"]
             i = off
             while i + 2 <= len(rom_data):
-                entry = struct.unpack_from('<H', rom_data, i)[0]
+                entry = _U16.unpack_from(rom_data, i)[0]
                 if entry == 0xFFFF or entry == 0:
                     break
                 level, move_id = entry >> 9, entry & 0x1FF
@@ -4267,72 +4729,20 @@ def _auto_decode(path: str, data: bytes, _rom=None):
     if not role:
         return {"_unknown": True, "reason": f"no role for {narc_part}", "hint": f"scope({path}) or dowse(name='...', narc_path='{narc_part}')"}
 
-    rom = current_rom['rom']
+    handler = _ROLE_DISPATCH.get(role)
+    if handler is None:
+        if role.startswith('pwt_rosters'):
+            handler = _ROLE_DISPATCH['pwt_rosters']
+        elif role.startswith('pwt_trainers'):
+            handler = _ROLE_DISPATCH['pwt_trainers']
+        else:
+            return None
 
     try:
-        if role in ('trpoke', 'trdata'):
-            formatted = format_trainer(file_idx)
-            return formatted
-        elif role == 'personal':
-            return decode_personal(data, file_idx)
-        elif role == 'learnsets':
-            return decode_learnset(data, file_idx)
-        elif role == 'evolutions':
-            return decode_evolution(data, file_idx)
-        elif role == 'move_data':
-            return decode_move_data(data, file_idx)
-        elif role == 'encounters':
-            decoded = decode_encounters(data)
-            if decoded:
-                # Resolve location name -- use game-specific mapping
-                gc = current_rom['header']['game_code'] if current_rom else ''
-                loc_id = 0
-                # Auto-built table from BFS (preferred — no hardcoding)
-                auto_table = _auto_enc_loc.get(gc, {})
-                if auto_table:
-                    loc_id = auto_table.get(file_idx, 0)
-                elif gc in ('ADA', 'APA'):  # Diamond / Pearl — ARM9 table
-                    arm9 = current_rom.get('arm9_data')
-                    if arm9 and 0xED738 + file_idx * 2 + 2 <= len(arm9):
-                        loc_id = struct.unpack_from('<H', arm9, 0xED738 + file_idx * 2)[0]
-                else:
-                    # No auto-built table and not DP ARM9 — BFS didn't find zone headers
-                    pass
-                if loc_id:
-                    location_names = text_tables.get('location_names', [])
-                    decoded['location'] = location_names[loc_id] if loc_id < len(location_names) else f'Area #{file_idx}'
-                else:
-                    decoded['location'] = f'Area #{file_idx}'
-                formatted = format_encounter(decoded, file_idx)
-                return formatted if formatted else decoded
-        elif role == 'pwt_defs':
-            return decode_pwt_tournament_def(data, file_idx)
-        elif role.startswith('pwt_rosters'):
-            return decode_pwt_roster(data, file_idx, roster_role=role)
-        elif role.startswith('pwt_trainers'):
-            return decode_pwt_trainer_config(data, file_idx, trainer_role=role)
-        elif role in _PWT_POOL_ROLES:
-            pool = role[4:].replace('_b', '-B').replace('_', ' ').title()
-            return decode_pwt(data, 'champions' in role, pool, file_idx)
-        elif role == 'subway_pokemon':
-            return decode_pwt(data, False, 'Battle Subway', file_idx)
-        elif role == 'subway_trainers':
-            return decode_pwt_roster(data, file_idx, roster_role='subway_trainers')
-        elif role == 'battle_tower_pokemon':
-            return decode_pwt(data, True, 'Battle Tower', file_idx)
-        elif role == 'battle_tower_trainers':
-            return decode_pwt_roster(data, file_idx, roster_role='battle_tower_trainers')
-        elif role == 'pokeathlon_performance':
-            return decode_pokeathlon_performance(data, file_idx)
-        elif role == 'contest':
-            return decode_contest(data, file_idx)
-        elif role == 'items':
-            return decode_items(data, file_idx)
+        return handler(data, file_idx, role)
     except Exception as e:
         return {"_error": f"Decoder crash: {e}", "role": role}
 
-    return None
-
 
 
 
@@ -4387,29 +4797,36 @@ async def spotlight(path: str) -> dict:
     if rom_type == 'nds':
         rom = ndspy.rom.NintendoDSRom.fromFile(path)
 
+        # Load and decompress all ARM9 overlays (also sizes them for a first-time flipnote)
+        overlays = _load_overlays(rom)
+
         fpn_path = find_flipnote(gc)
         if fpn_path:
             fpn_path = upgrade_to_shared_flipnote(gc)
         else:
-            structure, rom_stats = build_nds_structure(rom, path)
+            structure, rom_stats = build_nds_structure(rom, path, overlays)
             fpn_path = create_flipnote(
                 gc, header['game_title'], header['region'],
                 header['region_char'], structure, rom_stats, header['is_english']
             )
 
-        # Decompress ARM9 via blz (ndspy does NOT decompress BLZ-compressed ARM9)
+        # Decompress ARM9 (ndspy does NOT decompress BLZ-compressed ARM9) — in memory,
+        # with the blz tool as a fallback for anything the in-process decoder rejects
         raw_arm9 = bytes(rom.arm9)
         try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.bin') as tmp:
-                tmp.write(raw_arm9)
-                tmp_path = tmp.name
-            decompress_arm9(tmp_path)
-            with open(tmp_path, 'rb') as f:
-                arm9_data = bytearray(f.read())
-            Path(tmp_path).unlink(missing_ok=True)
+            arm9_data = bytearray(_blz_decompress(raw_arm9))
         except Exception:
-            # Fallback: use raw if blz fails (might not be compressed)
-            arm9_data = bytearray(raw_arm9)
+            try:
+                with tempfile.NamedTemporaryFile(delete=False, suffix='.bin') as tmp:
+                    tmp.write(raw_arm9)
+                    tmp_path = tmp.name
+                decompress_arm9(tmp_path)
+                with open(tmp_path, 'rb') as f:
+                    arm9_data = bytearray(f.read())
+                Path(tmp_path).unlink(missing_ok=True)
+            except Exception:
+                # Fallback: use raw if blz fails (might not be compressed)
+                arm9_data = bytearray(raw_arm9)
 
         # --- BW2 Challenge/Easy Mode stat recalc patch (silent, in-memory only) ---
         # The vanilla B2/W2 ROM has a bug where difficulty modes change enemy levels
@@ -4460,9 +4877,8 @@ async def spotlight(path: str) -> dict:
 
         arm7_data = bytearray(rom.arm7)
 
-        # Load and decompress all ARM9 overlays
-        overlays = _load_overlays(rom)
-
+        # Fresh file for this game code: parsed NARCs from an earlier open are stale
+        _drop_narc_cache(gc)
         current_rom = {
             'type': 'nds', 'path': path, 'rom': rom, 'header': header,
             'arm9_data': arm9_data, 'arm7_data': arm7_data,
@@ -4486,10 +4902,8 @@ async def spotlight(path: str) -> dict:
             text_table_result["tm_table"] = f"{tm_count} TM/HM entries found"
 
         # Seed narc_roles from GAME_INFO so decoders work before BFS completes
-        game_info = GAME_INFO.get(gc, {})
-        for role, narc_path in game_info.get('narcs', {}).items():
-            if role != 'text' and narc_path not in narc_roles:
-                narc_roles[narc_path] = role
+        for narc_path, role in _GAME_NARC_ROLES.get(gc, _NO_NARCS).items():
+            narc_roles.setdefault(narc_path, role)
 
     else:  # gba/gbc/gb
         # Load raw ROM binary into memory
@@ -4522,8 +4936,7 @@ async def spotlight(path: str) -> dict:
             if gen3_offsets:
                 text_table_result["gen3_tables"] = f"personal@0x{gen3_offsets.get('personal_base',0):X} move@0x{gen3_offsets.get('move_base',0):X}"
 
-    with open(fpn_path, 'r', encoding='utf-8') as f:
-        current_flipnote = {'path': str(fpn_path), 'data': json.load(f)}
+    current_flipnote = {'path': str(fpn_path), 'data': _jloads(fpn_path.read_bytes())}
 
     # Store in loaded_roms
     _save_active_state()
@@ -4604,8 +5017,7 @@ async def return_tool(save: bool = False) -> dict:
 
     # Remove from loaded_roms and clear its NARC cache
     loaded_roms.pop(gc, None)
-    for key in [k for k in _narc_cache if k[0] == gc]:
-        del _narc_cache[key]
+    _drop_narc_cache(gc)
 
     # Switch to another loaded ROM if available
     if loaded_roms:
@@ -4619,6 +5031,14 @@ async def return_tool(save: bool = False) -> dict:
     return result
 
 
+# NARC member first byte -> compression tag shown in summarize listings (None = untagged)
+_NARC_COMPRESSION_TAG = [None] * 256
+_NARC_COMPRESSION_TAG[0x10] = "lz10"
+_NARC_COMPRESSION_TAG[0x11] = "lz11"
+_NARC_COMPRESSION_TAG[0x24] = _NARC_COMPRESSION_TAG[0x28] = "huffman"
+_NARC_COMPRESSION_TAG[0x30] = "rle"
+
+
 async def summarize(path: str = "/", expand_narcs: bool = False) -> dict:
     """List contents at a path. Pass a NARC path to see its contents."""
     if not current_rom:
@@ -4650,14 +5070,12 @@ async def summarize(path: str = "/", expand_narcs: bool = False) -> dict:
                 gc = current_rom['header']['game_code']
                 narc_lbl = eonet_labels.get(gc, {}).get(clean_path, {}).get('labels', {})
                 narc_role = narc_roles.get(clean_path)
+                tag_of = _NARC_COMPRESSION_TAG
                 for i, f in enumerate(narc.files):
                     entry = {"index": i, "size": len(f), "path": f"{clean_path}:{i}"}
                     if narc_lbl.get(i): entry["label"] = narc_lbl[i]
-                    if len(f) >= 4:
-                        if f[0] == 0x10: entry["compression"] = "lz10"
-                        elif f[0] == 0x11: entry["compression"] = "lz11"
-                        elif f[0] in (0x24, 0x28): entry["compression"] = "huffman"
-                        elif f[0] == 0x30: entry["compression"] = "rle"
+                    if len(f) >= 4 and tag_of[f[0]]:
+                        entry["compression"] = tag_of[f[0]]
                     contents.append(entry)
                 result = {"path": clean_path, "type": "narc", "file_count": len(narc.files), "contents": contents}
                 if narc_role: result["role"] = narc_role
@@ -4703,11 +5121,14 @@ async def summarize(path: str = "/", expand_narcs: bool = False) -> dict:
 
             if len(file_data) >= 4 and file_data[:4] == b'NARC':
                 entry["type"] = "narc"
-                try:
-                    narc = _get_narc(full_path)
-                    entry["file_count"] = len(narc.files)
-                except:
-                    pass
+                n = _narc_file_count(file_data)
+                if n is None:
+                    try:
+                        n = len(_get_narc(full_path).files)
+                    except:
+                        pass
+                if n is not None:
+                    entry["file_count"] = n
                 role = narc_roles.get(full_path)
                 if role: entry["role"] = role
 
@@ -4769,11 +5190,15 @@ async def decipher(path: str, offset: int = 0, length: int = None, decompress: b
     global _user_active_gc
     # Multi-file: comma-separated paths
     if "," in path:
+        # Each distinct path is decoded once; repeats reuse the same result
+        seen = {}
         results = []
         for p in path.split(","):
             p = p.strip()
             if p:
-                results.append(await decipher(p, offset, length, decompress))
+                if p not in seen:
+                    seen[p] = await decipher(p, offset, length, decompress)
+                results.append(seen[p])
         return {"multi": True, "results": results}
 
     if not current_rom:
@@ -4805,18 +5230,19 @@ async def decipher(path: str, offset: int = 0, length: int = None, decompress: b
         rom = current_rom['rom']
 
         try:
+            # Code binaries stay as the live bytearrays here; only the requested range is copied below
             if path.lower() == 'arm9.bin':
-                data = bytes(current_rom['arm9_data'])
+                data = current_rom['arm9_data']
                 compression = 'none'
             elif path.lower() == 'arm7.bin':
-                data = bytes(current_rom['arm7_data'])
+                data = current_rom['arm7_data']
                 compression = 'none'
             elif _is_overlay_path(path) >= 0:
                 ov_id = _is_overlay_path(path)
                 overlays = current_rom.get('overlays', {})
                 if ov_id not in overlays:
                     return {"error": f"Overlay {ov_id} not found (available: {sorted(overlays.keys())})"}
-                data = bytes(overlays[ov_id])
+                data = overlays[ov_id]
                 compression = 'none'  # already decompressed during load
             elif ':' in path:
                 narc_path, file_idx = path.rsplit(':', 1)
@@ -4842,6 +5268,7 @@ async def decipher(path: str, offset: int = 0, length: int = None, decompress: b
                 data = data[offset:offset + length]
             elif offset:
                 data = data[offset:]
+            data = bytes(data)
             decoded = _auto_decode(path, data)
             _path_notes = _notes_for_path(path)
             result = {"path": path, "size": len(data), "compression": compression, "decoded": decoded}
@@ -4868,9 +5295,8 @@ async def decipher(path: str, offset: int = 0, length: int = None, decompress: b
                     "game_code": current_rom['header']['game_code']}
         return decoded
     else:
-        with open(current_rom['path'], 'rb') as f:
-            f.seek(offset)
-            data = f.read(length) if length else f.read()
+        raw = _raw_rom_data()
+        data = bytes(raw[offset:offset + length] if length else raw[offset:])
         return {"offset": offset, "size": len(data), "hex": _format_hex(data, offset)}
 
 
@@ -4995,8 +5421,7 @@ async def sketch(path: str, data: str, offset: int = 0, encoding: str = "hex") -
             return {"error": f"PNG conversion failed: {e}"}
 
     if encoding == "hex":
-        clean_hex = data.replace(' ', '').replace('\n', '').replace('\t', '').replace('\r', '')
-        data_bytes = bytes.fromhex(clean_hex)
+        data_bytes = bytes.fromhex(data.translate(_HEX_STRIP))
     elif encoding == "utf8":
         data_bytes = data.encode('utf-8')
     elif encoding == "utf16le":
@@ -5039,9 +5464,9 @@ async def sketch(path: str, data: str, offset: int = 0, encoding: str = "hex") -
                             "total_files": len(narc.files)}
 
                 file_idx = int(file_idx_str)
-                current_file = bytearray(narc.files[file_idx])
-                current_file[offset:offset + len(data_bytes)] = data_bytes
-                narc.files[file_idx] = bytes(current_file)
+                # Splice the patch straight into a new bytes object (no bytearray round-trip)
+                current_file = narc.files[file_idx]
+                narc.files[file_idx] = current_file[:offset] + data_bytes + current_file[offset + len(data_bytes):]
                 rom.setFileByName(narc_path.lstrip('/'), narc.save())
                 _invalidate_narc(narc_path.lstrip('/'))
 
@@ -5060,6 +5485,11 @@ async def sketch(path: str, data: str, offset: int = 0, encoding: str = "hex") -
         with open(current_rom['path'], 'r+b') as f:
             f.seek(offset)
             f.write(data_bytes)
+        # Keep the in-memory image that reads are served from in step with the file
+        raw = _raw_rom_data()
+        if offset > len(raw):
+            raw.extend(bytes(offset - len(raw)))
+        raw[offset:offset + len(data_bytes)] = data_bytes
         return {"written": len(data_bytes), "offset": offset}
 
 
@@ -5110,6 +5540,9 @@ async def record(output_path: str) -> dict:
     return {"saved": output_path}
 
 
+_SCOPE_MAX_INLINE = 1 << 20  # dumps larger than this go to a file in working_dir instead of inline hex
+
+
 async def scope(path: str = None, offset: int = 0, length: int = 256, search: str = None, xor: str = None) -> dict:
     """Raw hex dump with optional search. xor: hex key to XOR data before display."""
     if not current_rom:
@@ -5131,15 +5564,15 @@ async def scope(path: str = None, offset: int = 0, length: int = 256, search: st
         rom = current_rom['rom']
         try:
             if path.lower() == 'arm9.bin':
-                data = bytes(current_rom['arm9_data'])
+                data = current_rom['arm9_data']
             elif path.lower() == 'arm7.bin':
-                data = bytes(current_rom['arm7_data'])
+                data = current_rom['arm7_data']
             elif _is_overlay_path(path) >= 0:
                 ov_id = _is_overlay_path(path)
                 overlays = current_rom.get('overlays', {})
                 if ov_id not in overlays:
                     return {"error": f"Overlay {ov_id} not found (available: {sorted(overlays.keys())})"}
-                data = bytes(overlays[ov_id])
+                data = overlays[ov_id]
             elif ':' in path:
                 narc_path, file_idx = path.rsplit(':', 1)
                 file_idx = int(file_idx)
@@ -5152,25 +5585,28 @@ async def scope(path: str = None, offset: int = 0, length: int = 256, search: st
         except Exception as e:
             return {"error": f"File not found: {path} ({e})"}
     else:
-        with open(current_rom['path'], 'rb') as f:
-            f.seek(offset)
-            data = f.read(length + (1024 if search else 0))
+        data = bytes(_raw_rom_data()[offset:offset + length + (1024 if search else 0)])
 
-    dump_data = data[offset:offset + length] if current_rom['type'] == 'nds' and path else data[:length]
+    # Copy just the dumped window (code binaries are still the live bytearrays)
+    dump_data = bytes(data[offset:offset + length]) if current_rom['type'] == 'nds' and path else data[:length]
 
     # Apply XOR key if provided
     if xor:
-        xor_bytes = bytes.fromhex(xor.replace(' ', ''))
+        xor_bytes = bytes.fromhex(xor.translate(_HEX_STRIP))
         dump_data = bytes(b ^ xor_bytes[i % len(xor_bytes)] for i, b in enumerate(dump_data))
 
-    hex_lines = []
-    for i in range(0, len(dump_data), 16):
-        chunk = dump_data[i:i + 16]
-        hex_part = ' '.join(f'{b:02X}' for b in chunk)
-        ascii_part = ''.join(chr(b) if 32 <= b < 127 else '.' for b in chunk)
-        hex_lines.append(f"{offset + i:08X}  {hex_part:<48}  {ascii_part}")
-
-    result = {"offset": offset, "length": len(dump_data), "dump": '\n'.join(hex_lines)}
+    if len(dump_data) > _SCOPE_MAX_INLINE:
+        # A multi-MB hex dump is ~4.5x its size as text; hand back the raw bytes as a file instead
+        ensure_dirs()
+        gc = current_rom['header']['game_code']
+        safe_path = re.sub(r'[^\w.-]', '_', path or 'rom')
+        dump_file = working_dir / f"{gc}_{safe_path}_{offset:X}.bin"
+        dump_file.write_bytes(dump_data)
+        result = {"offset": offset, "length": len(dump_data), "dump_file": str(dump_file),
+                  "dump": _format_hex(dump_data[:256], offset),
+                  "dump_note": f"first 256B shown — full {len(dump_data)} bytes written to dump_file"}
+    else:
+        result = {"offset": offset, "length": len(dump_data), "dump": _format_hex(dump_data, offset)}
 
     # Auto-disassemble ARM9, ARM7, and overlay paths
     if path and _cs_arm is not None:
@@ -5191,16 +5627,8 @@ async def scope(path: str = None, offset: int = 0, length: int = 256, search: st
                 result["disasm"] = '\n'.join(disasm_lines)
 
     if search:
-        search_bytes = bytes.fromhex(search.replace(' ', ''))
-        results = []
-        pos = 0
-        while True:
-            pos = data.find(search_bytes, pos)
-            if pos == -1:
-                break
-            results.append({"offset": offset + pos})
-            pos += 1
-        result["search_results"] = results
+        search_bytes = bytes.fromhex(search.translate(_HEX_STRIP))
+        result["search_results"] = [{"offset": offset + pos} for pos in _find_all(data, search_bytes)]
 
     return result
 
@@ -5243,21 +5671,18 @@ async def dowse(narc_path: str = None, hex: str = None, name: str = None, table:
             # Only search named tables (string keys), skip numeric file indices
             tables_to_search = {k: v for k, v in text_tables.items() if isinstance(k, str) and isinstance(v, list)}
         for tbl_name, entries in tables_to_search.items():
-            for idx, entry in enumerate(entries):
-                if not isinstance(entry, str):
-                    continue
-                if exact:
-                    if entry.lower() == query:
-                        results.append({"table": tbl_name, "index": idx, "name": entry})
-                else:
-                    if query in entry.lower():
-                        results.append({"table": tbl_name, "index": idx, "name": entry})
+            lowered = _lowered_table(tbl_name, entries)
+            if exact:
+                hits = [idx for idx, entry in enumerate(lowered) if entry == query]
+            else:
+                hits = [idx for idx, entry in enumerate(lowered) if query in entry]
+            results.extend({"table": tbl_name, "index": idx, "name": entries[idx]} for idx in hits)
         # Auto-resolve trainer_classes hits → trdata files via class ID byte
         class_hits = [r for r in results if r.get('table') == 'trainer_classes']
         if class_hits and current_rom:
             try:
                 gc = current_rom.get('header', {}).get('game_code', '')
-                trdata_path = GAME_INFO.get(gc, {}).get('narcs', {}).get('trdata')
+                trdata_path = _GAME_NARCS.get(gc, _NO_NARCS).get('trdata')
                 if trdata_path:
                     td_files = _get_narc(trdata_path).files
                     for ch in class_hits:
@@ -5271,7 +5696,7 @@ async def dowse(narc_path: str = None, hex: str = None, name: str = None, table:
         name_hits = [r for r in results if r.get('table') == 'trainer_names']
         if name_hits and current_rom:
             gc = current_rom.get('header', {}).get('game_code', '')
-            trdata_path = GAME_INFO.get(gc, {}).get('narcs', {}).get('trdata')
+            trdata_path = _GAME_NARCS.get(gc, _NO_NARCS).get('trdata')
             for nh in name_hits:
                 if trdata_path:
                     nh.setdefault('paths', []).append(f"{trdata_path}:{nh['index']:03d}")
@@ -5331,7 +5756,7 @@ async def dowse(narc_path: str = None, hex: str = None, name: str = None, table:
 
             # Chain traversal: when there's a clear match, show the relational graph
             # This follows foreign key chains through the ROM — like a SQL JOIN
-            if results and len(results) <= 3:
+            if resolve_chain and results and len(results) <= 3:
                 gc = current_rom['header']['game_code'] if current_rom else ''
                 for r in results:
                     try:
@@ -5389,7 +5814,7 @@ async def dowse(narc_path: str = None, hex: str = None, name: str = None, table:
             if rival and current_rom:
                 try:
                     gc = current_rom.get('header', {}).get('game_code', '')
-                    trdata_path = GAME_INFO.get(gc, {}).get('narcs', {}).get('trdata')
+                    trdata_path = _GAME_NARCS.get(gc, _NO_NARCS).get('trdata')
                     if trdata_path:
                         td_files = _get_narc(trdata_path).files
                         for fi, td in enumerate(td_files):
@@ -5449,17 +5874,12 @@ async def dowse(narc_path: str = None, hex: str = None, name: str = None, table:
             return {"error": "Hex search only supported for NDS"}
         if not narc_path:
             return {"error": "Provide narc_path, arm9.bin, arm7.bin, or overlayN.bin"}
-        search_bytes = bytes.fromhex(hex.replace(" ", ""))
+        search_bytes = bytes.fromhex(hex.translate(_HEX_STRIP))
 
         # ARM9 / ARM7
         if narc_path.lower() in ("arm9.bin", "arm7.bin"):
-            data = bytes(current_rom["arm9_data"] if narc_path.lower() == "arm9.bin" else current_rom["arm7_data"])
-            offsets, pos = [], 0
-            while True:
-                pos = data.find(search_bytes, pos)
-                if pos < 0: break
-                offsets.append(f"0x{pos:X}")
-                pos += 1
+            data = current_rom["arm9_data"] if narc_path.lower() == "arm9.bin" else current_rom["arm7_data"]
+            offsets = [f"0x{pos:X}" for pos in _find_all(data, search_bytes)]
             return {"pattern": hex, "path": narc_path, "matches": offsets, "count": len(offsets)}
 
         # Overlay
@@ -5468,13 +5888,8 @@ async def dowse(narc_path: str = None, hex: str = None, name: str = None, table:
             overlays = current_rom.get("overlays", {})
             if ov_id not in overlays:
                 return {"error": f"Overlay {ov_id} not found (available: {sorted(overlays.keys())})"}
-            data = bytes(overlays[ov_id])
-            offsets, pos = [], 0
-            while True:
-                pos = data.find(search_bytes, pos)
-                if pos < 0: break
-                offsets.append(f"0x{pos:X}")
-                pos += 1
+            data = overlays[ov_id]
+            offsets = [f"0x{pos:X}" for pos in _find_all(data, search_bytes)]
             return {"pattern": hex, "path": narc_path, "matches": offsets, "count": len(offsets)}
 
         # NARC
@@ -5482,21 +5897,17 @@ async def dowse(narc_path: str = None, hex: str = None, name: str = None, table:
             narc = _get_narc(narc_path.lstrip("/"))
         except Exception as e:
             return {"error": f"Could not open NARC: {e}"}
-        results = []
-        for idx, fdata in enumerate(narc.files):
-            offsets, pos = [], 0
-            while True:
-                pos = fdata.find(search_bytes, pos)
-                if pos < 0: break
-                offsets.append(pos)
-                pos += 1
-            if offsets:
-                results.append({"file": f"{narc_path}:{idx}", "offsets": offsets})
+        results = [{"file": f"{narc_path}:{idx}", "offsets": offsets}
+                   for idx, offsets in _find_all_in_files(narc.files, search_bytes)]
         return {"pattern": hex, "narc": narc_path, "matches": results, "count": len(results)}
     
     return {"error": "Provide either name (text lookup) or hex (hex search)"}
 
 
+_NONZERO_RUN = re.compile(rb'[^\x00]+')
+_DIFF_PAGE = 4096  # judgement compares this many bytes at a time and only scans pages that differ
+
+
 async def judgement(path_a: str, path_b: str) -> dict:
     """Compare two files. Supports cross-ROM: 'IRE:a/0/1/6:1' vs 'IPK:a/0/0/2:1'."""
     if not current_rom:
@@ -5519,17 +5930,18 @@ async def judgement(path_a: str, path_b: str) -> dict:
         return _resolve_nds_path(p)
 
     def _resolve_nds_path(p):
+        # Code binaries are compared through read-only views instead of full copies
         p = p.strip('/')
         if p.lower() == 'arm9.bin':
-            return bytes(current_rom['arm9_data'])
+            return memoryview(current_rom['arm9_data']).toreadonly()
         elif p.lower() == 'arm7.bin':
-            return bytes(current_rom['arm7_data'])
+            return memoryview(current_rom['arm7_data']).toreadonly()
         elif _is_overlay_path(p) >= 0:
             ov_id = _is_overlay_path(p)
             overlays = current_rom.get('overlays', {})
             if ov_id not in overlays:
                 raise ValueError(f"Overlay {ov_id} not found (available: {sorted(overlays.keys())})")
-            return bytes(overlays[ov_id])
+            return memoryview(overlays[ov_id]).toreadonly()
         elif ':' in p:
             narc_path, file_idx = p.rsplit(':', 1)
             file_idx = int(file_idx)
@@ -5546,24 +5958,38 @@ async def judgement(path_a: str, path_b: str) -> dict:
     except Exception as e:
         return {"error": str(e)}
 
+    # Walk the common prefix a page at a time: equal pages cost one memcmp. A page
+    # that differs is XORed as two big ints, whose non-zero runs are the differing offsets.
+    n = min(len(data_a), len(data_b))
     max_len = max(len(data_a), len(data_b))
-    raw_diffs = []
-    for i in range(max_len):
-        ba = data_a[i] if i < len(data_a) else None
-        bb = data_b[i] if i < len(data_b) else None
-        if ba != bb:
-            raw_diffs.append((i, ba, bb))
-
-    # Group into consecutive ranges
+    diff_bytes = max_len - n
+
     ranges = []
-    for off, ba, bb in raw_diffs:
-        if ranges and off == ranges[-1]['end'] + 1:
-            ranges[-1]['end'] = off
-            ranges[-1]['count'] += 1
+    for page in range(0, n, _DIFF_PAGE):
+        page_end = min(page + _DIFF_PAGE, n)
+        page_a, page_b = data_a[page:page_end], data_b[page:page_end]
+        if page_a == page_b:
+            continue
+        mask = (int.from_bytes(page_a, 'big') ^ int.from_bytes(page_b, 'big')).to_bytes(page_end - page, 'big')
+        diff_bytes += page_end - page - mask.count(0)
+        for m in _NONZERO_RUN.finditer(mask):
+            start, end = page + m.start(), page + m.end() - 1
+            if ranges and ranges[-1]['end'] == start - 1:
+                # Run carries on across a page boundary
+                ranges[-1]['end'] = end
+                ranges[-1]['count'] = end - ranges[-1]['start'] + 1
+            else:
+                ranges.append({"start": start, "end": end, "count": end - start + 1,
+                               "a": f"{data_a[start]:02X}", "b": f"{data_b[start]:02X}"})
+    # Length mismatch: the tail differs byte-for-byte against nothing
+    if max_len > n:
+        if ranges and ranges[-1]['end'] == n - 1:
+            ranges[-1]['end'] = max_len - 1
+            ranges[-1]['count'] += max_len - n
         else:
-            ranges.append({"start": off, "end": off, "count": 1,
-                           "a": f"{ba:02X}" if ba is not None else "N/A",
-                           "b": f"{bb:02X}" if bb is not None else "N/A"})
+            ranges.append({"start": n, "end": max_len - 1, "count": max_len - n,
+                           "a": f"{data_a[n]:02X}" if n < len(data_a) else "N/A",
+                           "b": f"{data_b[n]:02X}" if n < len(data_b) else "N/A"})
 
     # Summarise each range
     diff_summary = []
@@ -5573,10 +5999,10 @@ async def judgement(path_a: str, path_b: str) -> dict:
         diff_summary.append({"range": s, "a": r['a'], "b": r['b']})
 
     return {
-        "identical": not raw_diffs,
+        "identical": not diff_bytes,
         "size_a": len(data_a), "size_b": len(data_b),
         "diff_regions": len(ranges),
-        "diff_bytes": len(raw_diffs),
+        "diff_bytes": diff_bytes,
         "differences": diff_summary
     }
 
@@ -5701,21 +6127,13 @@ async def list_flipnotes(**_) -> dict:
     ensure_dirs()
 
     flipnotes = []
-    for fpn in flipnotes_dir.glob("*.fpn"):
-        try:
-            with open(fpn, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                codes = data.get('game_codes', [])
-                if not codes:
-                    codes = [data.get('game_code', '')]
-                flipnotes.append({
-                    "game_codes": codes,
-                    "title": data.get('game_title'),
-                    "path": str(fpn),
-                    "note_count": len(data.get('notes', {}))
-                })
-        except:
-            continue
+    for fpn, meta in _iter_flipnote_meta():
+        flipnotes.append({
+            "game_codes": meta['game_codes'],
+            "title": meta['game_title'],
+            "path": fpn,
+            "note_count": meta['note_count']
+        })
 
     return {"flipnotes": flipnotes}
 
@@ -5723,14 +6141,14 @@ async def list_flipnotes(**_) -> dict:
 async def view_flipnote(game: str, search: str = None, summary: bool = False) -> dict:
     """View a Flipnote. search= filters notes by path/description. summary=True returns note count + paths only."""
     ensure_dirs()
-    for fpn in flipnotes_dir.glob("*.fpn"):
+    for fpn, meta in _iter_flipnote_meta():
         try:
-            with open(fpn, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            codes = data.get('game_codes', []) or [data.get('game_code', '')]
-            title_lower = data.get('game_title', '').lower()
+            codes = meta['game_codes']
+            title_lower = (meta['game_title'] or '').lower()
             if game not in codes and not all(w in title_lower for w in game.lower().split()):
                 continue
+            # Only the matching flipnote is parsed in full
+            data = _jloads(Path(fpn).read_bytes())
             notes = data.get('notes', {})
             if search:
                 q = search.lower()
@@ -5752,22 +6170,25 @@ async def note(path: str, description: str, name: str = None, format: str = None
                tags: list = None, file_range: str = None, examples: list = None,
                related: list = None, game: str = None) -> dict:
     """Add a note to a Flipnote. Defaults to current ROM, or specify game code."""
+    entry = {"description": description}
+    if name: entry["name"] = name
+    if format: entry["format"] = format
+    if tags: entry["tags"] = tags
+    if file_range: entry["file_range"] = file_range
+    if examples: entry["examples"] = examples
+    if related: entry["related"] = related
+
     # Multi-ROM: if game specified, find that flipnote
     if game:
         fpn_path = find_flipnote(game)
         if not fpn_path:
             return {"error": f"No flipnote for game: {game}"}
-        with open(fpn_path, 'r', encoding='utf-8') as f:
-            fpn_data = json.load(f)
-        fpn_data.setdefault('notes', {})[path] = {"description": description}
-        if name: fpn_data['notes'][path]["name"] = name
-        if format: fpn_data['notes'][path]["format"] = format
-        if tags: fpn_data['notes'][path]["tags"] = tags
-        if file_range: fpn_data['notes'][path]["file_range"] = file_range
-        if examples: fpn_data['notes'][path]["examples"] = examples
-        if related: fpn_data['notes'][path]["related"] = related
-        with open(fpn_path, 'w', encoding='utf-8') as f:
-            json.dump(fpn_data, f, indent=2, ensure_ascii=False)
+        fpn_data = _jloads(fpn_path.read_bytes())
+        notes = fpn_data.setdefault('notes', {})
+        # Re-noting an identical entry leaves the file untouched
+        if notes.get(path) != entry:
+            notes[path] = entry
+            _write_json(fpn_path, fpn_data)
         return {"noted": path, "description": description, "game": game}
 
     if not current_rom:
@@ -5776,16 +6197,10 @@ async def note(path: str, description: str, name: str = None, format: str = None
         return {"error": "No flipnote loaded"}
 
     fpn_data = current_flipnote['data']
-    fpn_data.setdefault('notes', {})[path] = {"description": description}
-    if name: fpn_data['notes'][path]["name"] = name
-    if format: fpn_data['notes'][path]["format"] = format
-    if tags: fpn_data['notes'][path]["tags"] = tags
-    if file_range: fpn_data['notes'][path]["file_range"] = file_range
-    if examples: fpn_data['notes'][path]["examples"] = examples
-    if related: fpn_data['notes'][path]["related"] = related
-
-    with open(current_flipnote['path'], 'w', encoding='utf-8') as f:
-        json.dump(fpn_data, f, indent=2, ensure_ascii=False)
+    notes = fpn_data.setdefault('notes', {})
+    if notes.get(path) != entry:
+        notes[path] = entry
+        _write_json(current_flipnote['path'], fpn_data)
 
     # Log for future recovery
     _log_note(path=path, description=description, name=name, format=format,
@@ -5810,8 +6225,7 @@ async def batch_notes(notes: list, game: str = None) -> dict:
         fpn_path = find_flipnote(game)
         if not fpn_path:
             return {"error": f"No flipnote for game: {game}"}
-        with open(fpn_path, 'r', encoding='utf-8') as f:
-            fpn_data = json.load(f)
+        fpn_data = _jloads(fpn_path.read_bytes())
         target_path = fpn_path
     elif current_flipnote:
         fpn_data = current_flipnote['data']
@@ -5837,8 +6251,7 @@ async def batch_notes(notes: list, game: str = None) -> dict:
                   tags=n.get('tags'), file_range=n.get('file_range'), related=n.get('related'))
         written += 1
 
-    with open(target_path, 'w', encoding='utf-8') as f:
-        json.dump(fpn_data, f, indent=2, ensure_ascii=False)
+    _write_json(target_path, fpn_data)
 
     if not game and current_flipnote:
         current_flipnote['data'] = fpn_data
@@ -5853,7 +6266,7 @@ async def edit_note(path: str, description: str = None, name: str = None, format
     if game:
         fpn_path = find_flipnote(game)
         if not fpn_path: return {"error": f"No flipnote for game: {game}"}
-        with open(fpn_path, 'r', encoding='utf-8') as f: fpn_data = json.load(f)
+        fpn_data = _jloads(fpn_path.read_bytes())
         save_path = fpn_path
         in_memory = False
     elif current_flipnote:
@@ -5866,6 +6279,7 @@ async def edit_note(path: str, description: str = None, name: str = None, format
     if path not in fpn_data['notes']:
         return {"error": f"Note not found: {path}"}
 
+    before = dict(fpn_data['notes'][path])
     if description: fpn_data['notes'][path]["description"] = description
     if name is not None: fpn_data['notes'][path]["name"] = name
     if format is not None: fpn_data['notes'][path]["format"] = format
@@ -5874,8 +6288,9 @@ async def edit_note(path: str, description: str = None, name: str = None, format
     if examples is not None: fpn_data['notes'][path]["examples"] = examples
     if related is not None: fpn_data['notes'][path]["related"] = related
 
-    with open(save_path, 'w', encoding='utf-8') as f:
-        json.dump(fpn_data, f, indent=2, ensure_ascii=False)
+    # Only rewrite the flipnote when the edit actually changed the note
+    if fpn_data['notes'][path] != before:
+        _write_json(save_path, fpn_data)
     if in_memory: current_flipnote['data'] = fpn_data
     return {"edited": path}
 
@@ -5885,7 +6300,7 @@ async def delete_note(path: str, game: str = None) -> dict:
     if game:
         fpn_path = find_flipnote(game)
         if not fpn_path: return {"error": f"No flipnote for game: {game}"}
-        with open(fpn_path, 'r', encoding='utf-8') as f: fpn_data = json.load(f)
+        fpn_data = _jloads(fpn_path.read_bytes())
         save_path = fpn_path
         in_memory = False
     elif current_flipnote:
@@ -5898,8 +6313,7 @@ async def delete_note(path: str, game: str = None) -> dict:
     if path not in fpn_data['notes']:
         return {"error": f"Note not found: {path}"}
     del fpn_data['notes'][path]
-    with open(save_path, 'w', encoding='utf-8') as f:
-        json.dump(fpn_data, f, indent=2, ensure_ascii=False)
+    _write_json(save_path, fpn_data)
     if in_memory: current_flipnote['data'] = fpn_data
     return {"deleted": path}
 
@@ -5923,20 +6337,25 @@ async def probe(path: str, offset: int = 0, reads: str = "u16", count: int = 1,
             _switch_rom(orig_gc)
     elif gc_prefix:
         path = clean_path
+    type_info = {
+        'u8': (1, 'B'), 'u16': (2, 'H'), 'u32': (4, 'I'),
+        's8': (1, 'b'), 's16': (2, 'h'), 's32': (4, 'i'),
+        'ptr32': (4, 'I'),
+    }
+    src = None  # in-memory image (ROM / code binary) that data is cut from
     try:
         if current_rom['type'] != 'nds':
-            with open(current_rom['path'], 'rb') as f:
-                data = f.read()
+            src = _raw_rom_data()
         elif path.lower() == 'arm9.bin':
-            data = bytes(current_rom['arm9_data'])
+            src = current_rom['arm9_data']
         elif path.lower() == 'arm7.bin':
-            data = bytes(current_rom['arm7_data'])
+            src = current_rom['arm7_data']
         elif _is_overlay_path(path) >= 0:
             ov_id = _is_overlay_path(path)
             overlays = current_rom.get('overlays', {})
             if ov_id not in overlays:
                 return {"error": f"Overlay {ov_id} not found (available: {sorted(overlays.keys())})"}
-            data = bytes(overlays[ov_id])
+            src = overlays[ov_id]
         elif ':' in path:
             narc_path, file_idx = path.rsplit(':', 1)
             narc = _get_narc(narc_path.lstrip('/'))
@@ -5947,9 +6366,20 @@ async def probe(path: str, offset: int = 0, reads: str = "u16", count: int = 1,
             data, _ = decompress_data(raw)
     except Exception as e:
         return {"error": f"Failed to read {path}: {e}"}
+    data_off = 0  # file offset of data[0]
+    if src is not None:
+        if reads in ('text', 'ptr32') or offset < 0:
+            # Text decodes the whole file and pointers can land anywhere in it
+            data = bytes(src)
+        else:
+            # Copy just the window the reads cover, not the whole image
+            size = type_info.get(reads, (1, 'B'))[0]
+            step = stride if stride > 0 else size
+            data_off = offset
+            data = src[offset:offset + (max(count, 1) - 1) * step + size]
     if xor:
-        xk = bytes.fromhex(xor.replace(' ', ''))
-        data = bytes(b ^ xk[i % len(xk)] for i, b in enumerate(data))
+        xk = bytes.fromhex(xor.translate(_HEX_STRIP))
+        data = bytes(b ^ xk[(data_off + i) % len(xk)] for i, b in enumerate(data))
     if reads == 'text':
         gen = text_gen or 5
         if gen == 5 and text_mult is not None:
@@ -5960,11 +6390,6 @@ async def probe(path: str, offset: int = 0, reads: str = "u16", count: int = 1,
             return {"error": "No text decoder available"}
         return {"path": path, "type": "text", "entries": len(strings),
                 "strings": strings[:count] if count < len(strings) else strings}
-    type_info = {
-        'u8': (1, 'B'), 'u16': (2, 'H'), 'u32': (4, 'I'),
-        's8': (1, 'b'), 's16': (2, 'h'), 's32': (4, 'i'),
-        'ptr32': (4, 'I'),
-    }
     if reads not in type_info:
         return {"error": f"Unknown type: {reads}. Use: u8 u16 u32 s8 s16 s32 ptr32 text"}
     size, fmt_char = type_info[reads]
@@ -5995,10 +6420,10 @@ async def probe(path: str, offset: int = 0, reads: str = "u16", count: int = 1,
         ]
     for i in range(count):
         pos = offset + i * step
-        if pos + size > len(data):
+        if pos - data_off + size > len(data):
             results.append({"i": i, "off": f"0x{pos:X}", "error": "EOF"})
             break
-        val = struct.unpack_from(f'{bo}{fmt_char}', data, pos)[0]
+        val = struct.unpack_from(f'{bo}{fmt_char}', data, pos - data_off)[0]
         entry = {"i": i, "off": f"0x{pos:X}", "val": val, "hex": f"0x{val:0{size*2}X}"}
         if _annot_tables and val > 0:
             for tname, label, cap in _annot_tables:
@@ -6012,7 +6437,7 @@ async def probe(path: str, offset: int = 0, reads: str = "u16", count: int = 1,
             entry["file_off"] = f"0x{foff:X}"
             if 0 <= foff < len(data):
                 peek = data[foff:foff + 16]
-                entry["peek"] = ' '.join(f'{b:02X}' for b in peek)
+                entry["peek"] = peek.hex(' ').upper()
         results.append(entry)
     _path_notes = _notes_for_path(path)
     out = {"path": path, "offset": f"0x{offset:X}", "type": reads, "count": len(results)}
@@ -6026,6 +6451,28 @@ async def probe(path: str, offset: int = 0, reads: str = "u16", count: int = 1,
 
 # ============ Server Setup ============
 
+# Tool name -> handler, built once rather than per call_tool request
+_TOOL_HANDLERS = {
+    "spotlight": spotlight,
+    "return": return_tool,
+    "summarize": summarize,
+    "decipher": decipher,
+    "sketch": sketch,
+    "record": record,
+    "scope": scope,
+    "dowse": dowse,
+    "judgement": judgement,
+    "stats": stats,
+    "list_flipnotes": list_flipnotes,
+    "view_flipnote": view_flipnote,
+    "note": note,
+    "batch_notes": batch_notes,
+    "edit_note": edit_note,
+    "delete_note": delete_note,
+    "probe": probe
+}
+
+
 @server.call_tool()
 async def call_tool(name: str, arguments: dict):
     """Route tool calls to handler functions."""
@@ -6035,27 +6482,7 @@ async def call_tool(name: str, arguments: dict):
             await _restore_task
         else:
             await _do_pending_restore()
-    handlers = {
-        "spotlight": spotlight,
-        "return": return_tool,
-        "summarize": summarize,
-        "decipher": decipher,
-        "sketch": sketch,
-        "record": record,
-        "scope": scope,
-        "dowse": dowse,
-        "judgement": judgement,
-        "stats": stats,
-        "list_flipnotes": list_flipnotes,
-        "view_flipnote": view_flipnote,
-        "note": note,
-        "batch_notes": batch_notes,
-        "edit_note": edit_note,
-        "delete_note": delete_note,
-        "probe": probe
-    }
-
-    handler = handlers.get(name)
+    handler = _TOOL_HANDLERS.get(name)
     if not handler:
         raise ValueError(f"Unknown tool: {name}")
     
@@ -6091,8 +6518,8 @@ async def call_tool(name: str, arguments: dict):
                 if gc in ('IRB', 'IRA'):
                     return ''
                 # Only apply to trainer NARCs — not personal, learnsets, etc.
-                trdata_path = GAME_INFO.get(gc, {}).get('narcs', {}).get('trdata', '')
-                trpoke_path = GAME_INFO.get(gc, {}).get('narcs', {}).get('trpoke', '')
+                trdata_path = _GAME_NARCS.get(gc, _NO_NARCS).get('trdata', '')
+                trpoke_path = _GAME_NARCS.get(gc, _NO_NARCS).get('trpoke', '')
                 path_narc = path_str.rsplit(':', 1)[0] if ':' in path_str else path_str
                 if path_narc not in (trdata_path, trpoke_path):
                     return ''
@@ -6201,160 +6628,164 @@ async def call_tool(name: str, arguments: dict):
     return [TextContent(type="text", text=text)]
 
 
+# Tool definitions are static, so they're built once at import instead of on every list_tools request
+_TOOLS = (
+    Tool(name="spotlight", description="Open a ROM file for exploration. Second call on the same game restores from ICR cache instantly (no rescan). Returns NARC paths for key roles (trdata, trpoke, personal, learnsets).", inputSchema={
+        "type": "object",
+        "properties": {"path": {"type": "string", "description": "Absolute path to .nds, .gba, .gbc, or .gb file"}},
+        "required": ["path"]
+    }),
+    Tool(name="return", description="Close the current ROM. If multiple ROMs are open, switches to the next one. Use save=True only when you have sketched changes you want to keep.", inputSchema={
+        "type": "object",
+        "properties": {"save": {"type": "boolean", "description": "Repack and save before closing (default: false). Only needed after sketch calls."}}
+    }),
+    Tool(name="summarize", description="List filesystem contents or NARC file indices. Use to explore unknown paths. Skip if the path is already known from spotlight output or ICR.", inputSchema={
+        "type": "object",
+        "properties": {
+            "path": {"type": "string", "description": "Folder path (default: root) or NARC file path to list its internal files"},
+            "expand_narcs": {"type": "boolean", "description": "Show NARC file count inline (default: false)"}
+        }
+    }),
+    Tool(name="decipher", description="Read and decode a file. Known flipnote notes surface automatically at the top of output — read them before interpreting. Auto-decodes: trainers (trdata+trpoke combined), personal stats, learnsets, evolutions, move data, encounters (with location name), items, Pokeathlon, contest, PWT/subway/tower pools. Returns decoded text when recognized, hex summary otherwise. Path syntax: arm9.bin, narc/path:index, overlay0.bin. Comma-separate for multi-file.", inputSchema={
+        "type": "object",
+        "properties": {
+            "path": {"type": "string", "description": "File path. NARC files: 'a/0/9/1:156'. ARM: 'arm9.bin'. Cross-ROM: 'IRE:a/0/9/1:156'. Comma-separated for batch."},
+            "offset": {"type": "integer", "description": "Byte offset (default: 0)"},
+            "length": {"type": "integer", "description": "Bytes to read (default: all)"},
+            "decompress": {"type": "boolean", "description": "Auto-decompress LZ10/LZ11 (default: true)"}
+        },
+        "required": ["path"]
+    }),
+    Tool(name="sketch", description="Write bytes to a file. Writes in-place to the loaded ROM (not disk) — call record to persist. NARC append: use ':append' as index (e.g. 'a/2/6/7:append'). PNG sprite import: encoding='png', data=base64 or file path — auto-converts to NCGR/NCLR/NSCR triplet and appends to NARC.", inputSchema={
+        "type": "object",
+        "properties": {
+            "path": {"type": "string", "description": "File path. Use ':append' to add new file to NARC (e.g. a/2/6/7:append)"},
+            "data": {"type": "string", "description": "Data to write. Hex by default. For png encoding: base64 string or file path on disk."},
+            "offset": {"type": "integer", "description": "Byte offset to write at (default: 0)"},
+            "encoding": {"type": "string", "enum": ["hex", "utf8", "utf16le", "ascii", "png"], "description": "Encoding. 'png' converts image to NDS tile format (NCGR/NCLR/NSCR)."}
+        },
+        "required": ["path", "data"]
+    }),
+    Tool(name="record", description="Repack and save the ROM to disk. Recompresses ARM9 and writes all modified NARCs and overlays. Only needed after sketch calls. Can write to the original path or a new file.", inputSchema={
+        "type": "object",
+        "properties": {"output_path": {"type": "string", "description": "Output file path (can be same as input to overwrite)"}},
+        "required": ["output_path"]
+    }),
+    Tool(name="scope", description="Raw hex dump. Auto-disassembles ARM9, ARM7, and overlay paths (ARM/Thumb). Flipnote notes surface automatically. Use when decipher doesn't auto-decode and you need to inspect raw bytes, search for a byte pattern, or apply an XOR mask. For structured reads use probe instead.", inputSchema={
+        "type": "object",
+        "properties": {
+            "path": {"type": "string", "description": "File path (same syntax as decipher)"},
+            "offset": {"type": "integer", "description": "Start offset (default: 0)"},
+            "length": {"type": "integer", "description": "Bytes to dump (default: 256)"},
+            "search": {"type": "string", "description": "Hex pattern to find — returns all offsets"},
+            "xor": {"type": "string", "description": "XOR key applied before display (e.g. 'AB' or 'AB CD EF')"}
+        }
+    }),
+    Tool(name="dowse", description="Three modes: (1) name lookup — find species/move/item/trainer/location in text tables, returns file indices; if no text hit, falls back to NARC role/category search (e.g. name='encounters' or name='trdata'). (2) name+narc_path — find NARCs containing that entity as a u16 reference. (3) hex+narc_path — find files in a NARC containing a byte pattern.", inputSchema={
+        "type": "object",
+        "properties": {
+            "name": {"type": "string", "description": "Entity or category to search. Searches all text tables; falls back to NARC role names if no match."},
+            "table": {"type": "string", "description": "Restrict to one table: species, moves, items, abilities, trainer_names, trainer_classes"},
+            "exact": {"type": "boolean", "description": "Exact match instead of substring (default: false)"},
+            "narc_path": {"type": "string", "description": "With name: find NARCs referencing this entity. With hex: search this NARC for a byte pattern."},
+            "hex": {"type": "string", "description": "Hex pattern to find in NARC files (requires narc_path)"},
+            "difficulty": {"type": "string", "description": "Filter trainer results by difficulty mode: normal, challenge, easy (BW2 only — Challenge Mode has separate trainer files)"}
+        }
+    }),
+    Tool(name="judgement", description="Byte-level diff of two files. Supports cross-ROM comparison using game code prefix: 'IRE:a/0/1/6:1' vs 'IPK:a/0/0/2:1'. Same path syntax as decipher.", inputSchema={
+        "type": "object",
+        "properties": {
+            "path_a": {"type": "string", "description": "First file path (cross-ROM prefix supported: 'IRE:a/0/9/1:38')"},
+            "path_b": {"type": "string", "description": "Second file path"}
+        },
+        "required": ["path_a", "path_b"]
+    }),
+    Tool(name="stats", description="Show ICR index coverage: how many NARCs and files have been indexed, which roles are decoded, and how many manual flipnote notes exist. Use to assess what the server knows about the current ROM.", inputSchema={
+        "type": "object", "properties": {}
+    }),
+    Tool(name="list_flipnotes", description="List all flipnotes (one per game pair). Flipnotes store manual notes that persist across all restarts. Use view_flipnote to read a specific one.", inputSchema={
+        "type": "object", "properties": {}
+    }),
+    Tool(name="view_flipnote", description="Read the flipnote for a game. summary=True returns paths only (cheaper). search= filters notes by path or description.", inputSchema={
+        "type": "object",
+        "properties": {
+            "game": {"type": "string", "description": "Game code (e.g. IRE) or partial title (e.g. Black 2)"},
+            "search": {"type": "string", "description": "Filter notes by path or description keyword"},
+            "summary": {"type": "boolean", "description": "Return paths only, no descriptions (default: false)"}
+        },
+        "required": ["game"]
+    }),
+    Tool(name="note", description="Permanently record a discovery. Notes survive all restarts. Use immediately after finding something — NARC role, format, offset, bracket mapping, anything. Prefer batch_notes for 3+ notes.", inputSchema={
+        "type": "object",
+        "properties": {
+            "path": {"type": "string", "description": "Path being documented"},
+            "description": {"type": "string", "description": "What this path contains"},
+            "name": {"type": "string", "description": "Human-readable name"},
+            "format": {"type": "string", "description": "File format description"},
+            "tags": {"type": "array", "items": {"type": "string"}, "description": "Tags for categorization"},
+            "file_range": {"type": "string", "description": "Description of file range"},
+            "examples": {"type": "array", "items": {"type": "string"}, "description": "Example files"},
+            "related": {"type": "array", "items": {"type": "string"}, "description": "Related paths"},
+            "game": {"type": "string", "description": "Game code to write to (e.g. IPK, IRE). Defaults to current ROM."}
+        },
+        "required": ["path", "description"]
+    }),
+    Tool(name="batch_notes", description="Write multiple notes in one disk write. Use instead of repeated note calls when documenting multiple paths at once.", inputSchema={
+        "type": "object",
+        "properties": {
+            "notes": {"type": "array", "items": {"type": "object", "properties": {
+                "path": {"type": "string"}, "description": {"type": "string"},
+                "name": {"type": "string"}, "format": {"type": "string"},
+                "tags": {"type": "array", "items": {"type": "string"}},
+                "file_range": {"type": "string"}, "related": {"type": "array", "items": {"type": "string"}}
+            }, "required": ["path", "description"]}, "description": "Array of notes to write"},
+            "game": {"type": "string", "description": "Game code (defaults to current ROM)"}
+        },
+        "required": ["notes"]
+    }),
+    Tool(name="edit_note", description="Edit an existing note", inputSchema={
+        "type": "object",
+        "properties": {
+            "path": {"type": "string", "description": "Path of note"},
+            "description": {"type": "string", "description": "New description"},
+            "name": {"type": "string", "description": "Human-readable name"},
+            "format": {"type": "string", "description": "File format description"},
+            "tags": {"type": "array", "items": {"type": "string"}, "description": "Tags"},
+            "file_range": {"type": "string", "description": "File range description"},
+            "examples": {"type": "array", "items": {"type": "string"}, "description": "Examples"},
+            "related": {"type": "array", "items": {"type": "string"}, "description": "Related paths"},
+            "game": {"type": "string", "description": "Game code (defaults to current ROM)"}
+        },
+        "required": ["path"]
+    }),
+    Tool(name="probe", description="Structured binary read. Known flipnote notes for the path surface automatically — read them before interpreting raw values. Primary for ARM9, overlay, unknown binary. Types: u8/u16/u32/s8/s16/s32/ptr32/text. Auto-annotates values with species/move/item names when they match.", inputSchema={
+        "type": "object",
+        "properties": {
+            "path": {"type": "string", "description": "File path (arm9.bin, narc:index, overlay#.bin, or ROM file path)"},
+            "offset": {"type": "integer", "description": "Byte offset to start reading (default: 0)"},
+            "reads": {"type": "string", "description": "Type to read: u8/u16/u32/s8/s16/s32/ptr32/text (default: u16)"},
+            "count": {"type": "integer", "description": "Number of values to read (default: 1)"},
+            "xor": {"type": "string", "description": "XOR key hex (e.g. AB CD)"},
+            "endian": {"type": "string", "enum": ["little", "big"], "description": "Byte order (default: little)"},
+            "stride": {"type": "integer", "description": "Bytes between reads, 0=packed (default: 0)"},
+            "base": {"type": "integer", "description": "Base address for ptr32 pointer arithmetic"}
+        },
+        "required": ["path"]
+    }),
+    Tool(name="delete_note", description="Delete a note", inputSchema={
+        "type": "object",
+        "properties": {
+            "path": {"type": "string", "description": "Path of note to delete"},
+            "game": {"type": "string", "description": "Game code (defaults to current ROM)"}
+        },
+        "required": ["path"]
+    }),
+)
+
+
 @server.list_tools()
 async def list_tools():
-    return [
-        Tool(name="spotlight", description="Open a ROM file for exploration. Second call on the same game restores from ICR cache instantly (no rescan). Returns NARC paths for key roles (trdata, trpoke, personal, learnsets).", inputSchema={
-            "type": "object",
-            "properties": {"path": {"type": "string", "description": "Absolute path to .nds, .gba, .gbc, or .gb file"}},
-            "required": ["path"]
-        }),
-        Tool(name="return", description="Close the current ROM. If multiple ROMs are open, switches to the next one. Use save=True only when you have sketched changes you want to keep.", inputSchema={
-            "type": "object",
-            "properties": {"save": {"type": "boolean", "description": "Repack and save before closing (default: false). Only needed after sketch calls."}}
-        }),
-        Tool(name="summarize", description="List filesystem contents or NARC file indices. Use to explore unknown paths. Skip if the path is already known from spotlight output or ICR.", inputSchema={
-            "type": "object",
-            "properties": {
-                "path": {"type": "string", "description": "Folder path (default: root) or NARC file path to list its internal files"},
-                "expand_narcs": {"type": "boolean", "description": "Show NARC file count inline (default: false)"}
-            }
-        }),
-        Tool(name="decipher", description="Read and decode a file. Known flipnote notes surface automatically at the top of output — read them before interpreting. Auto-decodes: trainers (trdata+trpoke combined), personal stats, learnsets, evolutions, move data, encounters (with location name), items, Pokeathlon, contest, PWT/subway/tower pools. Returns decoded text when recognized, hex summary otherwise. Path syntax: arm9.bin, narc/path:index, overlay0.bin. Comma-separate for multi-file.", inputSchema={
-            "type": "object",
-            "properties": {
-                "path": {"type": "string", "description": "File path. NARC files: 'a/0/9/1:156'. ARM: 'arm9.bin'. Cross-ROM: 'IRE:a/0/9/1:156'. Comma-separated for batch."},
-                "offset": {"type": "integer", "description": "Byte offset (default: 0)"},
-                "length": {"type": "integer", "description": "Bytes to read (default: all)"},
-                "decompress": {"type": "boolean", "description": "Auto-decompress LZ10/LZ11 (default: true)"}
-            },
-            "required": ["path"]
-        }),
-        Tool(name="sketch", description="Write bytes to a file. Writes in-place to the loaded ROM (not disk) — call record to persist. NARC append: use ':append' as index (e.g. 'a/2/6/7:append'). PNG sprite import: encoding='png', data=base64 or file path — auto-converts to NCGR/NCLR/NSCR triplet and appends to NARC.", inputSchema={
-            "type": "object",
-            "properties": {
-                "path": {"type": "string", "description": "File path. Use ':append' to add new file to NARC (e.g. a/2/6/7:append)"},
-                "data": {"type": "string", "description": "Data to write. Hex by default. For png encoding: base64 string or file path on disk."},
-                "offset": {"type": "integer", "description": "Byte offset to write at (default: 0)"},
-                "encoding": {"type": "string", "enum": ["hex", "utf8", "utf16le", "ascii", "png"], "description": "Encoding. 'png' converts image to NDS tile format (NCGR/NCLR/NSCR)."}
-            },
-            "required": ["path", "data"]
-        }),
-        Tool(name="record", description="Repack and save the ROM to disk. Recompresses ARM9 and writes all modified NARCs and overlays. Only needed after sketch calls. Can write to the original path or a new file.", inputSchema={
-            "type": "object",
-            "properties": {"output_path": {"type": "string", "description": "Output file path (can be same as input to overwrite)"}},
-            "required": ["output_path"]
-        }),
-        Tool(name="scope", description="Raw hex dump. Auto-disassembles ARM9, ARM7, and overlay paths (ARM/Thumb). Flipnote notes surface automatically. Use when decipher doesn't auto-decode and you need to inspect raw bytes, search for a byte pattern, or apply an XOR mask. For structured reads use probe instead.", inputSchema={
-            "type": "object",
-            "properties": {
-                "path": {"type": "string", "description": "File path (same syntax as decipher)"},
-                "offset": {"type": "integer", "description": "Start offset (default: 0)"},
-                "length": {"type": "integer", "description": "Bytes to dump (default: 256)"},
-                "search": {"type": "string", "description": "Hex pattern to find — returns all offsets"},
-                "xor": {"type": "string", "description": "XOR key applied before display (e.g. 'AB' or 'AB CD EF')"}
-            }
-        }),
-        Tool(name="dowse", description="Three modes: (1) name lookup — find species/move/item/trainer/location in text tables, returns file indices; if no text hit, falls back to NARC role/category search (e.g. name='encounters' or name='trdata'). (2) name+narc_path — find NARCs containing that entity as a u16 reference. (3) hex+narc_path — find files in a NARC containing a byte pattern.", inputSchema={
-            "type": "object",
-            "properties": {
-                "name": {"type": "string", "description": "Entity or category to search. Searches all text tables; falls back to NARC role names if no match."},
-                "table": {"type": "string", "description": "Restrict to one table: species, moves, items, abilities, trainer_names, trainer_classes"},
-                "exact": {"type": "boolean", "description": "Exact match instead of substring (default: false)"},
-                "narc_path": {"type": "string", "description": "With name: find NARCs referencing this entity. With hex: search this NARC for a byte pattern."},
-                "hex": {"type": "string", "description": "Hex pattern to find in NARC files (requires narc_path)"},
-                "difficulty": {"type": "string", "description": "Filter trainer results by difficulty mode: normal, challenge, easy (BW2 only — Challenge Mode has separate trainer files)"}
-            }
-        }),
-        Tool(name="judgement", description="Byte-level diff of two files. Supports cross-ROM comparison using game code prefix: 'IRE:a/0/1/6:1' vs 'IPK:a/0/0/2:1'. Same path syntax as decipher.", inputSchema={
-            "type": "object",
-            "properties": {
-                "path_a": {"type": "string", "description": "First file path (cross-ROM prefix supported: 'IRE:a/0/9/1:38')"},
-                "path_b": {"type": "string", "description": "Second file path"}
-            },
-            "required": ["path_a", "path_b"]
-        }),
-        Tool(name="stats", description="Show ICR index coverage: how many NARCs and files have been indexed, which roles are decoded, and how many manual flipnote notes exist. Use to assess what the server knows about the current ROM.", inputSchema={
-            "type": "object", "properties": {}
-        }),
-        Tool(name="list_flipnotes", description="List all flipnotes (one per game pair). Flipnotes store manual notes that persist across all restarts. Use view_flipnote to read a specific one.", inputSchema={
-            "type": "object", "properties": {}
-        }),
-        Tool(name="view_flipnote", description="Read the flipnote for a game. summary=True returns paths only (cheaper). search= filters notes by path or description.", inputSchema={
-            "type": "object",
-            "properties": {
-                "game": {"type": "string", "description": "Game code (e.g. IRE) or partial title (e.g. Black 2)"},
-                "search": {"type": "string", "description": "Filter notes by path or description keyword"},
-                "summary": {"type": "boolean", "description": "Return paths only, no descriptions (default: false)"}
-            },
-            "required": ["game"]
-        }),
-        Tool(name="note", description="Permanently record a discovery. Notes survive all restarts. Use immediately after finding something — NARC role, format, offset, bracket mapping, anything. Prefer batch_notes for 3+ notes.", inputSchema={
-            "type": "object",
-            "properties": {
-                "path": {"type": "string", "description": "Path being documented"},
-                "description": {"type": "string", "description": "What this path contains"},
-                "name": {"type": "string", "description": "Human-readable name"},
-                "format": {"type": "string", "description": "File format description"},
-                "tags": {"type": "array", "items": {"type": "string"}, "description": "Tags for categorization"},
-                "file_range": {"type": "string", "description": "Description of file range"},
-                "examples": {"type": "array", "items": {"type": "string"}, "description": "Example files"},
-                "related": {"type": "array", "items": {"type": "string"}, "description": "Related paths"},
-                "game": {"type": "string", "description": "Game code to write to (e.g. IPK, IRE). Defaults to current ROM."}
-            },
-            "required": ["path", "description"]
-        }),
-        Tool(name="batch_notes", description="Write multiple notes in one disk write. Use instead of repeated note calls when documenting multiple paths at once.", inputSchema={
-            "type": "object",
-            "properties": {
-                "notes": {"type": "array", "items": {"type": "object", "properties": {
-                    "path": {"type": "string"}, "description": {"type": "string"},
-                    "name": {"type": "string"}, "format": {"type": "string"},
-                    "tags": {"type": "array", "items": {"type": "string"}},
-                    "file_range": {"type": "string"}, "related": {"type": "array", "items": {"type": "string"}}
-                }, "required": ["path", "description"]}, "description": "Array of notes to write"},
-                "game": {"type": "string", "description": "Game code (defaults to current ROM)"}
-            },
-            "required": ["notes"]
-        }),
-        Tool(name="edit_note", description="Edit an existing note", inputSchema={
-            "type": "object",
-            "properties": {
-                "path": {"type": "string", "description": "Path of note"},
-                "description": {"type": "string", "description": "New description"},
-                "name": {"type": "string", "description": "Human-readable name"},
-                "format": {"type": "string", "description": "File format description"},
-                "tags": {"type": "array", "items": {"type": "string"}, "description": "Tags"},
-                "file_range": {"type": "string", "description": "File range description"},
-                "examples": {"type": "array", "items": {"type": "string"}, "description": "Examples"},
-                "related": {"type": "array", "items": {"type": "string"}, "description": "Related paths"},
-                "game": {"type": "string", "description": "Game code (defaults to current ROM)"}
-            },
-            "required": ["path"]
-        }),
-        Tool(name="probe", description="Structured binary read. Known flipnote notes for the path surface automatically — read them before interpreting raw values. Primary for ARM9, overlay, unknown binary. Types: u8/u16/u32/s8/s16/s32/ptr32/text. Auto-annotates values with species/move/item names when they match.", inputSchema={
-            "type": "object",
-            "properties": {
-                "path": {"type": "string", "description": "File path (arm9.bin, narc:index, overlay#.bin, or ROM file path)"},
-                "offset": {"type": "integer", "description": "Byte offset to start reading (default: 0)"},
-                "reads": {"type": "string", "description": "Type to read: u8/u16/u32/s8/s16/s32/ptr32/text (default: u16)"},
-                "count": {"type": "integer", "description": "Number of values to read (default: 1)"},
-                "xor": {"type": "string", "description": "XOR key hex (e.g. AB CD)"},
-                "endian": {"type": "string", "enum": ["little", "big"], "description": "Byte order (default: little)"},
-                "stride": {"type": "integer", "description": "Bytes between reads, 0=packed (default: 0)"},
-                "base": {"type": "integer", "description": "Base address for ptr32 pointer arithmetic"}
-            },
-            "required": ["path"]
-        }),
-        Tool(name="delete_note", description="Delete a note", inputSchema={
-            "type": "object",
-            "properties": {
-                "path": {"type": "string", "description": "Path of note to delete"},
-                "game": {"type": "string", "description": "Game code (defaults to current ROM)"}
-            },
-            "required": ["path"]
-        })
-    ]
+    return list(_TOOLS)
 
 
 if __name__ == "__main__":
@@ -6364,6 +6795,8 @@ if __name__ == "__main__":
     async def main():
         async with stdio_server() as (read_stream, write_stream):
             setup_tools()
+            for _t in ('blz', 'lzss', 'lzx', 'huffman', 'rle'):
+                get_tool_path(_t)
             ensure_dirs()
             
             # Restore ROMs in background — don't block MCP handshake
@@ -4,12 +4,19 @@ Auto-download and setup CUE's DS/GBA compression tools.
 Called automatically on server startup if tools are missing.
 """
 
+import functools
+import importlib.util
 import os
 import platform
+import re
+import shutil
 import stat
 import subprocess
 import sys
+import tarfile
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Redirect all print output to stderr to avoid corrupting MCP JSON-RPC on stdout
@@ -29,9 +36,30 @@ RAR_FILENAME = "Nintendo_DS_Compressors_v1.4-CUE.rar"
 # UnRAR for Windows (official from rarlab.com)
 UNRAR_URL = "https://www.rarlab.com/rar/unrarw32.exe"
 
+# Optional mirror of the prebuilt tools as a tar archive (.tar.gz etc.) for this platform.
+# When set it is tried first: a plain streamed download with no RAR, UnRAR or browser involved.
+TOOLS_ARCHIVE_URL = os.environ.get("LINKPLAY_TOOLS_URL")
+
+# RAR members to extract: a .exe whose file name (not directory) contains a tool name
+_TOOL_EXE_RE = re.compile(r'(?:blz|lzss|lzx|huffman|rle)[^/\\]*\.exe$', re.IGNORECASE)
+
+# rwxr-xr-x: mode given to installed tools on Unix (fresh extractions, so no existing bits to keep)
+_TOOL_MODE = stat.S_IRWXU | stat.S_IRGRP | stat.S_IXGRP | stat.S_IROTH | stat.S_IXOTH
+
+# Optional download/extract dependencies, probed once without importing them
+_HAS_RARFILE = importlib.util.find_spec("rarfile") is not None
+_HAS_CLOUDSCRAPER = importlib.util.find_spec("cloudscraper") is not None
+_HAS_UNDETECTED_CHROMEDRIVER = importlib.util.find_spec("undetected_chromedriver") is not None
+
+# Set LINKPLAY_DEBUG to get the [DEBUG] tool-check messages on stderr
+_DEBUG = bool(os.environ.get("LINKPLAY_DEBUG"))
+
 # Tools directory relative to this script
 TOOLS_DIR = Path(__file__).resolve().parent / "tools"
 
+# tool name -> resolved path, filled by get_tool_path() (only for tools actually found on disk)
+_TOOL_PATH_CACHE = {}
+
 
 def get_platform_name():
     """Get normalized platform name for tool selection."""
@@ -45,73 +73,124 @@ def get_platform_name():
     return system
 
 
+# The platform can't change at runtime, so resolve it once at import
+_PLATFORM_NAME = get_platform_name()
+_IS_WINDOWS = _PLATFORM_NAME == "win32"
+
+
 def get_tool_names():
-    """Get list of required tool names with platform-specific extensions."""
-    tools = ['blz', 'lzss', 'lzx', 'huffman', 'rle']
-    if platform.system() == "Windows":
-        return [f"{tool}.exe" for tool in tools]
-    return tools
+    """Get tuple of required tool names with platform-specific extensions."""
+    return _TOOL_NAMES
+
+
+_TOOL_NAMES = ('blz', 'lzss', 'lzx', 'huffman', 'rle')
+if _IS_WINDOWS:
+    _TOOL_NAMES = tuple(f"{tool}.exe" for tool in _TOOL_NAMES)
 
 
 def check_tools_installed():
     """Check if all required tools are present."""
-    platform_name = get_platform_name()
+    platform_name = _PLATFORM_NAME
     platform_dir = TOOLS_DIR / platform_name
     
-    print(f"[DEBUG] Checking tools in: {platform_dir}", file=sys.stderr)
+    if _DEBUG:
+        print(f"[DEBUG] Checking tools in: {platform_dir}", file=sys.stderr)
     
-    if not platform_dir.exists():
-        print(f"[DEBUG] Platform dir does not exist", file=sys.stderr)
+    # One directory read instead of a stat per tool (normcase: case-insensitive on Windows).
+    # Empty files are left by interrupted installs, so they count as missing.
+    try:
+        with os.scandir(platform_dir) as it:
+            present = {os.path.normcase(entry.name) for entry in it
+                       if entry.is_file() and entry.stat().st_size > 0}
+    except OSError:
+        if _DEBUG:
+            print(f"[DEBUG] Platform dir does not exist", file=sys.stderr)
         return False
     
-    tool_names = get_tool_names()
-    for tool in tool_names:
-        tool_path = platform_dir / tool
-        if not tool_path.exists():
-            print(f"[DEBUG] Missing tool: {tool_path}", file=sys.stderr)
+    for tool in get_tool_names():
+        if os.path.normcase(tool) not in present:
+            if _DEBUG:
+                print(f"[DEBUG] Missing tool: {platform_dir / tool}", file=sys.stderr)
             return False
     
-    print(f"[DEBUG] All tools found!", file=sys.stderr)
+    if _DEBUG:
+        print(f"[DEBUG] All tools found!", file=sys.stderr)
     return True
 
 
+@functools.lru_cache(maxsize=1)
+def _downloads_dirs():
+    """Existing Downloads folders to look in, resolved once."""
+    # Common Downloads folder locations
+    home = Path.home()
+    candidates = [home / "Downloads", home / "Download"]
+    if _IS_WINDOWS:
+        candidates.append(Path(os.path.expandvars("%USERPROFILE%")) / "Downloads")
+    return tuple(dict.fromkeys(d for d in candidates if d.is_dir()))
+
+
 def find_rar_in_downloads():
     """
     Check if the RAR file already exists in the user's Downloads folder.
     Returns path if found, None otherwise.
     """
-    # Common Downloads folder locations
-    downloads_paths = [
-        Path.home() / "Downloads",
-        Path.home() / "Download",
-        Path(os.path.expandvars("%USERPROFILE%")) / "Downloads",
-    ]
-    
-    for downloads_dir in downloads_paths:
-        if downloads_dir.exists():
-            rar_path = downloads_dir / RAR_FILENAME
-            if rar_path.exists():
-                print(f"Found existing RAR file: {rar_path}")
-                return rar_path
+    for downloads_dir in _downloads_dirs():
+        rar_path = downloads_dir / RAR_FILENAME
+        if rar_path.exists():
+            print(f"Found existing RAR file: {rar_path}")
+            return rar_path
     
     return None
 
 
+def download_with_cloudscraper(url: str, output_path: Path, timeout: int = 30):
+    """
+    Download file with cloudscraper (plain HTTP session that solves Cloudflare's basic challenge).
+    Much lighter than starting Chrome; returns False (so Selenium is tried) if it's not installed
+    or the response isn't the RAR itself.
+    """
+    if not _HAS_CLOUDSCRAPER:
+        return False
+    
+    try:
+        import cloudscraper
+        print("Trying direct download via cloudscraper...")
+        scraper = cloudscraper.create_scraper()
+        with scraper.get(url, stream=True, timeout=timeout) as response:
+            if response.status_code != 200:
+                print(f"cloudscraper got HTTP {response.status_code}")
+                return False
+            response.raw.decode_content = True
+            head = response.raw.read(7)
+            if not head.startswith(b'Rar!'):
+                print("cloudscraper got a challenge page instead of the RAR")
+                return False
+            with open(output_path, 'wb') as f:
+                f.write(head)
+                shutil.copyfileobj(response.raw, f, 1 << 16)
+        print(f"Download complete: {output_path}")
+        return True
+    except Exception as e:
+        print(f"cloudscraper download failed: {e}")
+        output_path.unlink(missing_ok=True)
+        return False
+
+
 def download_with_selenium(url: str, output_path: Path, timeout: int = 60):
     """
     Download file using Selenium with undetected-chromedriver to bypass Cloudflare.
     Returns True if successful, False otherwise.
     """
-    try:
-        import undetected_chromedriver as uc
-        from selenium.webdriver.support.ui import WebDriverWait
-        from selenium.webdriver.support import expected_conditions as EC
-    except ImportError:
+    if not _HAS_UNDETECTED_CHROMEDRIVER:
         print("undetected-chromedriver not found. Install with: pip install undetected-chromedriver")
         return False
     
     driver = None
     try:
+        import undetected_chromedriver as uc
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        
         print("Starting browser to download file (this bypasses Cloudflare)...")
         
         # Setup Chrome options for download
@@ -121,6 +200,13 @@ def download_with_selenium(url: str, output_path: Path, timeout: int = 60):
         options.add_argument('--no-sandbox')
         options.add_argument('--disable-dev-shm-usage')
         
+        # Persistent profile keeps the Cloudflare clearance cookie and asset cache between runs
+        # (kept in the user's ~/.linkplay, not the checkout: it holds cookies)
+        profile_dir = Path.home() / ".linkplay" / "chrome-profile"
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        options.add_argument(f'--user-data-dir={profile_dir}')
+        options.add_argument(f'--disk-cache-dir={profile_dir / "cache"}')
+        
         # Set download directory
         download_dir = str(output_path.parent.absolute())
         prefs = {
@@ -134,6 +220,13 @@ def download_with_selenium(url: str, output_path: Path, timeout: int = 60):
         # Create undetected Chrome driver
         driver = uc.Chrome(options=options, version_main=None)
         
+        # Explicitly allow downloads via DevTools (headless Chrome may ignore the prefs)
+        try:
+            driver.execute_cdp_cmd("Browser.setDownloadBehavior",
+                                   {"behavior": "allow", "downloadPath": download_dir})
+        except Exception:
+            pass
+        
         print(f"Navigating to {url}...")
         driver.get(url)
         
@@ -141,22 +234,20 @@ def download_with_selenium(url: str, output_path: Path, timeout: int = 60):
         print("Waiting for download to complete...")
         start_time = time.time()
         
-        # Check for downloaded file
+        # Chrome writes to <name>.crdownload and renames it to the final name only once the
+        # download has finished, so the final file appearing with no partial left means done.
+        crdownload = output_path.with_suffix(output_path.suffix + '.crdownload')
+        reported = False
         while time.time() - start_time < timeout:
-            # Check if file exists (might have .crdownload extension while downloading)
-            if output_path.exists():
-                # Wait a bit more to ensure download is complete
-                time.sleep(2)
-                if output_path.stat().st_size > 0:
-                    print(f"Download complete: {output_path}")
-                    return True
-            
-            # Check for .crdownload file (Chrome partial download)
-            crdownload = output_path.with_suffix(output_path.suffix + '.crdownload')
             if crdownload.exists():
-                print("Download in progress...")
+                if not reported:
+                    print("Download in progress...")
+                    reported = True
+            elif output_path.exists() and output_path.stat().st_size > 0:
+                print(f"Download complete: {output_path}")
+                return True
             
-            time.sleep(1)
+            time.sleep(0.1)
         
         print("Download timeout reached")
         return False
@@ -171,103 +262,164 @@ def download_with_selenium(url: str, output_path: Path, timeout: int = 60):
             driver.quit()
 
 
+@functools.lru_cache(maxsize=1)
+def _resolve_unrar_tool():
+    """UnRAR to extract with: WinRAR's if installed, else our own copy in TOOLS_DIR (may not exist yet)."""
+    winrar_unrar = Path("C:/Program Files/WinRAR/UnRAR.exe")
+    if winrar_unrar.exists():
+        return winrar_unrar
+    return TOOLS_DIR / "unrar.exe"
+
+
+def _download_unrar(unrar_exe: Path):
+    """Fetch UnRAR.exe from rarlab.com to unrar_exe."""
+    print("Downloading UnRAR.exe...")
+    import urllib.request
+    # Stream to a .part file and rename it into place, so a failed or abandoned
+    # download never leaves a truncated unrar.exe that later runs would trust
+    part_path = unrar_exe.with_name(unrar_exe.name + ".part")
+    try:
+        with urllib.request.urlopen(UNRAR_URL, timeout=30) as response:
+            with open(part_path, 'wb') as f:
+                shutil.copyfileobj(response, f, 1 << 16)  # stream 64 KB chunks to disk
+        os.replace(part_path, unrar_exe)
+    finally:
+        part_path.unlink(missing_ok=True)
+
+
+def download_tools_archive(url: str, timeout: int = 30):
+    """
+    Install the tools from a tar archive mirror, extracting while it downloads.
+    Members are matched by file name, so the archive layout doesn't matter.
+    Returns True if all tools are installed afterwards.
+    """
+    platform_dir = TOOLS_DIR / _PLATFORM_NAME
+    platform_dir.mkdir(parents=True, exist_ok=True)
+    wanted = {os.path.normcase(name) for name in get_tool_names()}
+    
+    try:
+        import urllib.request
+        print(f"Downloading compression tools from {url}...")
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            # 'r|*' reads the stream once, in order, with any compression tarfile knows
+            with tarfile.open(fileobj=response, mode='r|*') as tf:
+                for member in tf:
+                    name = os.path.basename(member.name)
+                    if not member.isfile() or os.path.normcase(name) not in wanted:
+                        continue
+                    target_path = platform_dir / name
+                    part_path = target_path.with_name(name + ".part")
+                    with tf.extractfile(member) as src, open(part_path, 'wb') as dst:
+                        shutil.copyfileobj(src, dst, 1 << 16)
+                    if not _IS_WINDOWS:
+                        os.chmod(part_path, _TOOL_MODE)
+                    os.replace(part_path, target_path)
+                    print(f"  Extracted: {name}")
+    except Exception as e:
+        print(f"Tools archive download failed: {e}")
+        return False
+    
+    return check_tools_installed()
+
+
 def download_and_extract_tools():
     """
     Download CUE's tools from romhacking.net and extract them.
     Multi-tier approach:
+    0. If LINKPLAY_TOOLS_URL points at a tar archive mirror, install from that
     1. Check if RAR exists in Downloads folder
-    2. If not, use Selenium UC to download it
-    3. Download UnRAR.exe if needed
+    2. If not, try cloudscraper, then Selenium UC to download it
+    3. Download UnRAR.exe if needed (started up front, in parallel with steps 1-2)
     4. Extract using rarfile + UnRAR
     Returns True if successful, False otherwise.
     """
-    platform_name = get_platform_name()
+    if TOOLS_ARCHIVE_URL and download_tools_archive(TOOLS_ARCHIVE_URL):
+        return True
+    
+    if not _HAS_RARFILE:
+        print("rarfile module not found. Install with: pip install rarfile")
+        return False
+    
+    platform_name = _PLATFORM_NAME
     platform_dir = TOOLS_DIR / platform_name
     platform_dir.mkdir(parents=True, exist_ok=True)
     
     temp_rar = None
     temp_unrar = None
+    unrar_pool = None
+    unrar_future = None
     
     try:
-        # Import rarfile
-        try:
-            import rarfile
-        except ImportError:
-            print("rarfile module not found. Install with: pip install rarfile")
-            return False
+        import rarfile
+        
+        # Start the UnRAR.exe fetch now so it overlaps the (much slower) Selenium download
+        unrar_exe = _resolve_unrar_tool()
+        if not unrar_exe.exists():
+            unrar_pool = ThreadPoolExecutor(max_workers=1)
+            unrar_future = unrar_pool.submit(_download_unrar, unrar_exe)
         
         # Step 1: Check if RAR file already exists in Downloads
         rar_path = find_rar_in_downloads()
         
         if not rar_path:
-            # Step 2: Download using Selenium
-            print(f"Downloading CUE's DS/GBA Compressors using Selenium...")
+            # Step 2: Download — cloudscraper first (no browser), Selenium as fallback
             temp_rar = TOOLS_DIR / RAR_FILENAME
             
-            if not download_with_selenium(TOOLS_DOWNLOAD_URL, temp_rar):
-                print("Selenium download failed")
-                return False
+            if not download_with_cloudscraper(TOOLS_DOWNLOAD_URL, temp_rar):
+                print(f"Downloading CUE's DS/GBA Compressors using Selenium...")
+                if not download_with_selenium(TOOLS_DOWNLOAD_URL, temp_rar):
+                    print("Selenium download failed")
+                    return False
             
             rar_path = temp_rar
         
         print(f"Using RAR file: {rar_path}")
         
-        # Step 3: Download UnRAR.exe if not present
-        unrar_exe = TOOLS_DIR / "unrar.exe"
-        if not unrar_exe.exists():
-            print("Downloading UnRAR.exe...")
-            import urllib.request
-            with urllib.request.urlopen(UNRAR_URL, timeout=30) as response:
-                with open(unrar_exe, 'wb') as f:
-                    f.write(response.read())
+        # Step 3: Wait for the UnRAR.exe download started above (re-raises if it failed)
+        if unrar_future is not None:
+            unrar_future.result()
         
         # Configure rarfile to use WinRAR's UnRAR.exe (if installed) or our downloaded one
-        winrar_unrar = Path("C:/Program Files/WinRAR/UnRAR.exe")
-        if winrar_unrar.exists():
-            rarfile.UNRAR_TOOL = str(winrar_unrar)
-        else:
-            rarfile.UNRAR_TOOL = str(unrar_exe)
+        rarfile.UNRAR_TOOL = str(unrar_exe)
         
         print(f"Extracting tools to {platform_dir}...")
         
-        # Extract RAR file
-        with rarfile.RarFile(rar_path) as rf:
-            extracted_count = 0
-            for file_info in rf.infolist():
+        # Extract RAR file into a staging dir (removed automatically, whatever the archive layout)
+        extracted_count = 0
+        with rarfile.RarFile(rar_path) as rf, tempfile.TemporaryDirectory(dir=TOOLS_DIR) as staging:
+            # Pick the Windows .exe tools first, then extract them in one pass
+            # (per-member extract() restarts decoding of a solid archive every call)
+            wanted = []
+            if platform_name == "win32":
+                wanted = [fi for fi in rf.infolist() if _TOOL_EXE_RE.search(fi.filename)]
+            if wanted:
+                rf.extractall(staging, members=wanted)
+            
+            for file_info in wanted:
                 filename = file_info.filename
                 
-                # Extract Windows .exe files
-                if platform_name == "win32" and filename.lower().endswith('.exe'):
-                    tool_name = os.path.basename(filename).lower()
-                    if any(tool in tool_name for tool in ['blz', 'lzss', 'lzx', 'huffman', 'rle']):
-                        # Extract to temp location
-                        rf.extract(file_info, TOOLS_DIR)
-                        
-                        # Move to platform directory root
-                        extracted_path = TOOLS_DIR / filename
-                        target_path = platform_dir / os.path.basename(filename)
-                        
-                        if extracted_path.exists():
-                            if extracted_path != target_path:
-                                extracted_path.rename(target_path)
-                            print(f"  Extracted: {os.path.basename(filename)}")
-                            extracted_count += 1
+                # Move to platform directory root
+                extracted_path = Path(staging) / filename
+                target_path = platform_dir / os.path.basename(filename)
+                
+                # Staging lives under TOOLS_DIR, so this is a same-volume rename
+                try:
+                    os.replace(extracted_path, target_path)
+                except FileNotFoundError:
+                    continue
+                print(f"  Extracted: {os.path.basename(filename)}")
+                extracted_count += 1
         
         # Clean up temp files
         if temp_rar and temp_rar.exists():
             temp_rar.unlink(missing_ok=True)
         
-        # Clean up any subdirectories created during extraction
-        for item in TOOLS_DIR.iterdir():
-            if item.is_dir() and item != platform_dir:
-                import shutil
-                shutil.rmtree(item, ignore_errors=True)
-        
         # Make tools executable on Unix
         if platform_name in ('linux', 'darwin'):
-            for tool_file in platform_dir.glob('*'):
-                if tool_file.is_file():
-                    tool_file.chmod(tool_file.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+            with os.scandir(platform_dir) as it:
+                for entry in it:
+                    if entry.is_file():
+                        os.chmod(entry.path, _TOOL_MODE)
         
         if extracted_count > 0 and check_tools_installed():
             print(f"Compression tools installed successfully ({extracted_count} tools)")
@@ -284,6 +436,9 @@ def download_and_extract_tools():
         if temp_rar and temp_rar.exists():
             temp_rar.unlink(missing_ok=True)
         return False
+    finally:
+        if unrar_pool is not None:
+            unrar_pool.shutdown(wait=False)
 
 
 def setup_tools():
@@ -305,7 +460,7 @@ def setup_tools():
         return True
     
     # Download failed, provide manual instructions
-    platform_name = get_platform_name()
+    platform_name = _PLATFORM_NAME
     platform_dir = TOOLS_DIR / platform_name
     
     print(f"""
@@ -327,20 +482,27 @@ def get_tool_path(tool_name):
     """
     Get the full path to a compression tool.
     Returns tool path if found, otherwise returns just the tool name.
+    Found paths are memoized; misses are checked again, so a later install is picked up.
     """
-    platform_name = get_platform_name()
+    cached = _TOOL_PATH_CACHE.get(tool_name)
+    if cached is not None:
+        return cached
+    
+    platform_name = _PLATFORM_NAME
     platform_dir = TOOLS_DIR / platform_name
     
-    if platform.system() == "Windows" and not tool_name.endswith('.exe'):
-        tool_name = f"{tool_name}.exe"
+    file_name = tool_name
+    if _IS_WINDOWS and not file_name.endswith('.exe'):
+        file_name = f"{file_name}.exe"
     
-    tool_path = platform_dir / tool_name
+    tool_path = platform_dir / file_name
     
     if tool_path.exists():
-        return str(tool_path)
+        resolved = _TOOL_PATH_CACHE[tool_name] = str(tool_path)
+        return resolved
     
     # Fall back to PATH
-    return tool_name
+    return file_name
 
 
 if __name__ == "__main__":
@@ -355,7 +517,7 @@ if __name__ == "__main__":
         if download_and_extract_tools():
             print("\nSetup complete!")
         else:
-            platform_name = get_platform_name()
+            platform_name = _PLATFORM_NAME
             platform_dir = TOOLS_DIR / platform_name
             print(f"""
 Manual installation required:
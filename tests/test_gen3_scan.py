@@ -0,0 +1,45 @@
+"""Gen III trainer-name scan on a synthetic ROM buffer."""
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("mcp")
+pytest.importorskip("ndspy")
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import server  # noqa: E402
+
+EOS = 0xFF
+CHARMAP = {0xBB + k: chr(ord('A') + k) for k in range(26)}
+ENCODE = {ch: b for b, ch in CHARMAP.items()}
+
+
+def _trainer(name, party_count=3, party_ptr=0x08001000):
+    """40-byte Gen III trainer struct: flags, class, music, sprite, name[12], ..., count, ptr."""
+    rec = bytearray(40)
+    rec[0:4] = bytes((0, 5, 0, 0))
+    encoded = bytes(ENCODE[ch] for ch in name)
+    rec[4:16] = encoded + bytes([EOS]) * (12 - len(encoded))
+    struct.pack_into('<II', rec, 32, party_count, party_ptr)
+    return bytes(rec)
+
+
+@pytest.fixture(autouse=True)
+def _clean_text_tables(monkeypatch):
+    monkeypatch.setattr(server, 'text_tables', {})
+
+
+def test_scan_gen3_trainer_names_finds_structs():
+    names = [f"TRAINER{chr(ord('A') + k)}" for k in range(12)]
+    rom = bytes(64) + b''.join(_trainer(n) for n in names) + bytes(64)
+    server._scan_gen3_trainer_names(rom, CHARMAP, EOS)
+    assert server.text_tables['trainer_names'] == names
+
+
+def test_scan_gen3_trainer_names_rejects_bad_party():
+    names = [f"TRAINER{chr(ord('A') + k)}" for k in range(12)]
+    rom = b''.join(_trainer(n, party_count=7) for n in names) + bytes(64)
+    server._scan_gen3_trainer_names(rom, CHARMAP, EOS)
+    assert 'trainer_names' not in server.text_tables